@@ -627,6 +627,19 @@ def create_vlg_node_group():
     return group
 
 
+# (color space, alpha mode) per texture role, applied when the image is loaded.
+_TEXTURE_ROLES = {
+    'base': ('sRGB', 'CHANNEL_PACKED'),
+    'normal': ('Non-Color', 'CHANNEL_PACKED'),
+    'lightwarp': ('sRGB', 'CHANNEL_PACKED'),
+    'exponent': ('Non-Color', 'CHANNEL_PACKED'),
+    'envmap': ('sRGB', 'CHANNEL_PACKED'),
+    'envmapmask': ('Non-Color', 'CHANNEL_PACKED'),
+    'selfillummask': ('Non-Color', 'CHANNEL_PACKED'),
+    'detail': ('sRGB', 'CHANNEL_PACKED'),
+}
+
+
 def load_texture(filepath, color_space='sRGB', alpha_mode='CHANNEL_PACKED'):
     """Load a texture from filepath, return image. Auto-converts VTF files.
     
@@ -988,7 +1001,7 @@ def apply_vlg_material(material, props):
     base_alpha = props.alpha
     
     if props.basetexture:
-        img = load_texture(props.basetexture, 'sRGB')
+        img = load_texture(props.basetexture, *_TEXTURE_ROLES['base'])
         if img:
             base_tex = nodes.new('ShaderNodeTexImage')
             base_tex.location = (tex_x, tex_y)
@@ -1074,7 +1087,7 @@ def apply_vlg_material(material, props):
     # NORMAL MAP
     # -------------------------------------------------------------------------
     if props.bumpmap:
-        img = load_texture(props.bumpmap, 'Non-Color')
+        img = load_texture(props.bumpmap, *_TEXTURE_ROLES['normal'])
         if img:
             bump_tex = nodes.new('ShaderNodeTexImage')
             bump_tex.location = (tex_x, tex_y)
@@ -1104,7 +1117,7 @@ def apply_vlg_material(material, props):
     # -------------------------------------------------------------------------
     lightwarp_color_node = None
     if props.lightwarptexture:
-        img = load_texture(props.lightwarptexture, 'sRGB')
+        img = load_texture(props.lightwarptexture, *_TEXTURE_ROLES['lightwarp'])
         if img:
             print(f"[SHADER] Applying lightwarp texture (SourceIO method): {props.lightwarptexture}")
             
@@ -1168,7 +1181,7 @@ def apply_vlg_material(material, props):
     # -------------------------------------------------------------------------
     phong_tex_node = None
     if props.phongexponenttexture:
-        img = load_texture(props.phongexponenttexture, 'Non-Color')
+        img = load_texture(props.phongexponenttexture, *_TEXTURE_ROLES['exponent'])
         if img:
             phong_tex = nodes.new('ShaderNodeTexImage')
             phong_tex.location = (tex_x, tex_y)
@@ -1240,7 +1253,7 @@ def apply_vlg_material(material, props):
         # Try to load the envmap texture
         # Special case: "env_cubemap" means use scene environment (no texture needed)
         if props.envmap.lower() not in ('env_cubemap', 'environment maps/metal_generic_001'):
-            envmap_image = load_texture(props.envmap, 'sRGB')
+            envmap_image = load_texture(props.envmap, *_TEXTURE_ROLES['envmap'])
             if envmap_image:
                 print(f"[ENVMAP] Loaded envmap texture: {envmap_image.name}")
             else:
@@ -1265,7 +1278,7 @@ def apply_vlg_material(material, props):
         
         # Envmap mask handling
         if props.envmapmask:
-            img = load_texture(props.envmapmask, 'Non-Color')
+            img = load_texture(props.envmapmask, *_TEXTURE_ROLES['envmapmask'])
             if img:
                 envmap_mask_tex = nodes.new('ShaderNodeTexImage')
                 envmap_mask_tex.location = (tex_x, tex_y - 200)
@@ -1336,7 +1349,7 @@ def apply_vlg_material(material, props):
         emission_color = props.selfillumtint[:]
         
         if props.selfillummask:
-            img = load_texture(props.selfillummask, 'Non-Color')
+            img = load_texture(props.selfillummask, *_TEXTURE_ROLES['selfillummask'])
             if img:
                 illum_tex = nodes.new('ShaderNodeTexImage')
                 illum_tex.location = (tex_x, tex_y)
@@ -1563,15 +1576,20 @@ def apply_vlg_material(material, props):
             
             links.new(tex_coord.outputs['Reflection'], env_texture.inputs['Vector'])
             
-            # Multiply sampled color by envmaptint
-            tint_mult = nodes.new('ShaderNodeMix')
-            tint_mult.data_type = 'RGBA'
-            tint_mult.blend_type = 'MULTIPLY'
+            # Tint and saturate the sampled color. $envmapcontrast is already applied
+            # to the envmap strength, so the group is specialized with contrast 0,
+            # and with saturation 1 (the default) when the VMT leaves it alone
+            saturation = props.envmapsaturation
+            envmap_group = shader_nodes.create_envmap_processing_node_group(
+                contrast_fixed=0.0, saturation_fixed=1.0 if saturation == 1.0 else None)
+            tint_mult = nodes.new('ShaderNodeGroup')
+            tint_mult.node_tree = envmap_group
             tint_mult.location = (500, -600)
-            tint_mult.inputs['Factor'].default_value = 1.0
-            tint_mult.inputs['B'].default_value = (*props.envmaptint, 1.0)
+            tint_mult.inputs['Tint'].default_value = (*props.envmaptint, 1.0)
+            tint_mult.inputs['Contrast'].default_value = 0.0
+            tint_mult.inputs['Saturation'].default_value = saturation
             tint_mult.label = "Envmap Tint"
-            links.new(env_texture.outputs['Color'], tint_mult.inputs['A'])
+            links.new(env_texture.outputs['Color'], tint_mult.inputs['Envmap Color'])
             
             # Scale by the envmap factor (mask, fresnel, contrast)
             strength_mult = nodes.new('ShaderNodeMix')
@@ -1607,7 +1625,7 @@ def apply_vlg_material(material, props):
     # DETAIL TEXTURE
     # -------------------------------------------------------------------------
     if props.detail:
-        img = load_texture(props.detail, 'sRGB')
+        img = load_texture(props.detail, *_TEXTURE_ROLES['detail'])
         if img:
             detail_tex = nodes.new('ShaderNodeTexImage')
             detail_tex.location = (tex_x - 200, tex_y)
@@ -0,0 +1,175 @@
+/*
+ * Optional native DXT1/3/5 decoder for vtf_parser.py
+ *
+ * vtf_parser loads this through ctypes when a compiled library sits next to it
+ * and falls back to its NumPy decoder otherwise. Build with e.g.:
+ *
+ *   Linux:   cc -O2 -shared -fPIC -o _dxt_decoder.so _dxt_decoder.c
+ *   macOS:   cc -O2 -shared -fPIC -o _dxt_decoder.dylib _dxt_decoder.c
+ *   Windows: cl /O2 /LD _dxt_decoder.c /Fe:_dxt_decoder.dll
+ *
+ * Output matches the Python decoder exactly: only complete blocks present in
+ * the input are decoded (the rest of dst is left untouched) and blocks are
+ * clipped at the image edge.
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+
+#ifdef _WIN32
+#define DXT_EXPORT __declspec(dllexport)
+#else
+#define DXT_EXPORT
+#endif
+
+/* Build the 4-entry RGBA palette of a DXT color block */
+static void color_palette(const uint8_t *block, int four_color_only, uint8_t palette[4][4])
+{
+    int c0 = block[0] | (block[1] << 8);
+    int c1 = block[2] | (block[3] << 8);
+    int rgb0[3], rgb1[3], ch;
+
+    rgb0[0] = ((c0 >> 11) & 0x1F) * 255 / 31;
+    rgb0[1] = ((c0 >> 5) & 0x3F) * 255 / 63;
+    rgb0[2] = (c0 & 0x1F) * 255 / 31;
+    rgb1[0] = ((c1 >> 11) & 0x1F) * 255 / 31;
+    rgb1[1] = ((c1 >> 5) & 0x3F) * 255 / 63;
+    rgb1[2] = (c1 & 0x1F) * 255 / 31;
+
+    for (ch = 0; ch < 3; ch++) {
+        palette[0][ch] = (uint8_t)rgb0[ch];
+        palette[1][ch] = (uint8_t)rgb1[ch];
+    }
+    palette[0][3] = palette[1][3] = palette[2][3] = palette[3][3] = 255;
+
+    if (four_color_only || c0 > c1) {
+        for (ch = 0; ch < 3; ch++) {
+            palette[2][ch] = (uint8_t)((2 * rgb0[ch] + rgb1[ch]) / 3);
+            palette[3][ch] = (uint8_t)((rgb0[ch] + 2 * rgb1[ch]) / 3);
+        }
+    } else {
+        /* 3-color mode: index 3 is transparent black */
+        for (ch = 0; ch < 3; ch++) {
+            palette[2][ch] = (uint8_t)((rgb0[ch] + rgb1[ch]) / 2);
+            palette[3][ch] = 0;
+        }
+        palette[3][3] = 0;
+    }
+}
+
+/* Write the 16 texels of block (bx, by) into dst, clipping at the image edge */
+static void store_block(uint8_t *dst, int width, int height, int bx, int by,
+                        const uint8_t palette[4][4], uint32_t indices, const uint8_t alpha[16])
+{
+    int px, py;
+
+    for (py = 0; py < 4; py++) {
+        int y = by * 4 + py;
+        if (y >= height)
+            break;
+        for (px = 0; px < 4; px++) {
+            int x = bx * 4 + px;
+            int texel = py * 4 + px;
+            const uint8_t *color = palette[(indices >> (2 * texel)) & 3];
+            uint8_t *out;
+            if (x >= width)
+                break;
+            out = dst + ((size_t)y * width + x) * 4;
+            out[0] = color[0];
+            out[1] = color[1];
+            out[2] = color[2];
+            out[3] = alpha ? alpha[texel] : color[3];
+        }
+    }
+}
+
+static uint32_t read_u32(const uint8_t *p)
+{
+    return (uint32_t)p[0] | ((uint32_t)p[1] << 8) | ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24);
+}
+
+static size_t block_count(size_t src_len, int width, int height, size_t block_bytes)
+{
+    size_t total = (size_t)((width + 3) / 4) * (size_t)((height + 3) / 4);
+    size_t available = src_len / block_bytes;
+    return available < total ? available : total;
+}
+
+DXT_EXPORT void dxt1_decode(const uint8_t *src, size_t src_len, uint8_t *dst, int width, int height)
+{
+    int block_width = (width + 3) / 4;
+    size_t count = block_count(src_len, width, height, 8);
+    size_t i;
+
+    for (i = 0; i < count; i++) {
+        const uint8_t *block = src + i * 8;
+        uint8_t palette[4][4];
+        color_palette(block, 0, palette);
+        store_block(dst, width, height, (int)(i % block_width), (int)(i / block_width),
+                    palette, read_u32(block + 4), NULL);
+    }
+}
+
+DXT_EXPORT void dxt3_decode(const uint8_t *src, size_t src_len, uint8_t *dst, int width, int height)
+{
+    int block_width = (width + 3) / 4;
+    size_t count = block_count(src_len, width, height, 16);
+    size_t i;
+    int t;
+
+    for (i = 0; i < count; i++) {
+        const uint8_t *block = src + i * 16;
+        uint8_t palette[4][4];
+        uint8_t alpha[16];
+
+        /* Explicit 4-bit alpha, low nibble first */
+        for (t = 0; t < 8; t++) {
+            alpha[t * 2] = (uint8_t)((block[t] & 0xF) * 17);
+            alpha[t * 2 + 1] = (uint8_t)((block[t] >> 4) * 17);
+        }
+
+        color_palette(block + 8, 1, palette);
+        store_block(dst, width, height, (int)(i % block_width), (int)(i / block_width),
+                    palette, read_u32(block + 12), alpha);
+    }
+}
+
+DXT_EXPORT void dxt5_decode(const uint8_t *src, size_t src_len, uint8_t *dst, int width, int height)
+{
+    int block_width = (width + 3) / 4;
+    size_t count = block_count(src_len, width, height, 16);
+    size_t i;
+    int t;
+
+    for (i = 0; i < count; i++) {
+        const uint8_t *block = src + i * 16;
+        uint8_t palette[4][4];
+        uint8_t alpha_palette[8];
+        uint8_t alpha[16];
+        uint64_t alpha_indices = 0;
+        int a0 = block[0];
+        int a1 = block[1];
+
+        /* 8 interpolated alphas if a0 > a1, else 6 plus 0 and 255 */
+        alpha_palette[0] = (uint8_t)a0;
+        alpha_palette[1] = (uint8_t)a1;
+        if (a0 > a1) {
+            for (t = 1; t < 7; t++)
+                alpha_palette[t + 1] = (uint8_t)(((7 - t) * a0 + t * a1) / 7);
+        } else {
+            for (t = 1; t < 5; t++)
+                alpha_palette[t + 1] = (uint8_t)(((5 - t) * a0 + t * a1) / 5);
+            alpha_palette[6] = 0;
+            alpha_palette[7] = 255;
+        }
+
+        for (t = 0; t < 6; t++)
+            alpha_indices |= (uint64_t)block[2 + t] << (8 * t);
+        for (t = 0; t < 16; t++)
+            alpha[t] = alpha_palette[(alpha_indices >> (3 * t)) & 7];
+
+        color_palette(block + 8, 1, palette);
+        store_block(dst, width, height, (int)(i % block_width), (int)(i / block_width),
+                    palette, read_u32(block + 12), alpha);
+    }
+}
@@ -4,18 +4,187 @@
 import bpy
 from mathutils import Vector
 
+# Node groups built here are internal helpers that are rarely opened in the
+# node editor, so node layout is skipped unless debugging the graphs.
+_SET_LOCATIONS = False
 
-def create_half_lambert_node_group():
+# Builders set every default_value before creating any links and tag the tree
+# once in between, so a group is not flagged for recompiling on every write.
+
+# Sockets are accessed by index instead of by name, which skips a name scan
+# over the socket list on every access. Indices used for the built-in nodes:
+#   Math:          in 0-2                                  | out 0 Value
+#   Vector Math:   in 0 Vector, 1 Vector, 3 Scale          | out 0 Vector, 1 Value
+#   Mix (FLOAT):   in 0 Factor, 2 A, 3 B                   | out 0 Result
+#   Mix (RGBA):    in 0 Factor, 6 A, 7 B                   | out 2 Result
+#   Map Range:     in 0 Value, 1 From Min, 2 From Max,
+#                  3 To Min, 4 To Max                      | out 0 Result
+#   Clamp:         in 0 Value, 1 Min, 2 Max                | out 0 Result
+#   Separate Color: in 0 Color                            | out 0 Red, 1 Green, 2 Blue
+#   Combine Color: in 0 Red, 1 Green, 2 Blue               | out 0 Color
+# Group input/output node sockets follow the interface order noted above
+# each builder.
+
+# Closed-form OSL versions of the non-branching groups. A single script node
+# replaces the whole node chain when Cycles renders with OSL; parameters are
+# declared in the same order as the matching group interface sockets.
+# The builders only use them when called with allow_osl=True (the default),
+# falling back to the node chain if the script does not compile.
+_OSL_SOURCES = {
+    'vlg_half_lambert': """
+shader vlg_half_lambert(
+    vector Normal = 0,
+    vector LightDir = 0,
+    float HalfLambert = 0.0,
+    output float Diffuse = 0.0)
+{
+    float NdotL = dot(Normal, LightDir);
+    float wrapped = NdotL * 0.5 + 0.5;
+    Diffuse = mix(clamp(NdotL, 0.0, 1.0), wrapped * wrapped, clamp(HalfLambert, 0.0, 1.0));
+}
+""",
+    'vlg_phong_fresnel': """
+shader vlg_phong_fresnel(
+    float NdotV = 0.0,
+    float Min = 0.0,
+    float Mid = 0.5,
+    float Max = 1.0,
+    output float Fresnel = 0.0)
+{
+    Fresnel = smoothstep(Min, Mid, 1.0 - NdotV) * Max;
+}
+""",
+    'vlg_rim_light': """
+shader vlg_rim_light(
+    vector Normal = 0,
+    vector ViewVector = 0,
+    float Exponent = 0.0,
+    float Boost = 0.0,
+    float Mask = 0.0,
+    output float Rim = 0.0)
+{
+    float rim = clamp(1.0 - dot(Normal, ViewVector), 0.0, 1.0);
+    Rim = pow(rim, Exponent) * Boost * Mask;
+}
+""",
+    'vlg_envmap_process': """
+shader vlg_envmap_process(
+    color EnvmapColor = 0,
+    color Tint = 0,
+    float Contrast = 0.0,
+    float Saturation = 0.0,
+    output color Result = 0)
+{
+    color tinted = EnvmapColor * Tint;
+    color c = mix(tinted, tinted * tinted, clamp(Contrast, 0.0, 1.0));
+    float y = 0.299 * c[0] + 0.587 * c[1] + 0.114 * c[2];
+    Result = mix(color(y, y, y), c, clamp(Saturation, 0.0, 1.0));
+}
+""",
+    'vlg_selfillum_fresnel': """
+shader vlg_selfillum_fresnel(
+    vector Normal = 0,
+    vector ViewVector = 0,
+    float MinBias = 0.0,
+    float MaxScale = 0.0,
+    float Exponent = 0.0,
+    output float Fresnel = 0.0)
+{
+    float NdotV = clamp(dot(Normal, ViewVector), 0.0, 1.0);
+    Fresnel = clamp(pow(NdotV, Exponent) * MaxScale + MinBias, 0.0, 1.0);
+}
+""",
+    'vlg_phong_specular': """
+shader vlg_phong_specular(
+    vector Normal = 0,
+    vector ViewVector = 0,
+    vector LightVector = 0,
+    float Exponent = 0.0,
+    float Boost = 0.0,
+    float Mask = 0.0,
+    float FresnelFactor = 0.0,
+    output float Specular = 0.0)
+{
+    vector R = reflect(-LightVector, normalize(Normal));
+    float RdotV = clamp(dot(R, ViewVector), 0.0, 1.0);
+    Specular = pow(RdotV, Exponent) * Boost * Mask * FresnelFactor;
+}
+""",
+}
+
+
+def _apply_defaults(defaults):
+    """Write constant node inputs from (node, input index, value) triples in one pass."""
+    for node, index, value in defaults:
+        node.inputs[index].default_value = value
+
+
+def _use_osl():
+    """Check whether the scene renders with Cycles OSL (script nodes are ignored otherwise)."""
+    scene = getattr(bpy.context, 'scene', None)
+    if scene is None or scene.render.engine != 'CYCLES':
+        return False
+    cycles = getattr(scene, 'cycles', None)
+    return bool(cycles and cycles.shading_system)
+
+
+def _build_osl_group(group, shader_name):
+    """
+    Fill an empty node group with a single OSL script node and wire it to the interface.
+    Returns None (and removes the group) if the script did not compile, so the
+    caller can build the node version instead.
+    """
+    nodes = group.nodes
+    links = group.links
+    
+    text_name = shader_name + ".osl"
+    text = bpy.data.texts.get(text_name)
+    created_text = text is None
+    if created_text:
+        text = bpy.data.texts.new(text_name)
+        text.write(_OSL_SOURCES[shader_name])
+    
+    # Assigning the text compiles the shader and creates the node sockets
+    script = nodes.new('ShaderNodeScript')
+    script.mode = 'INTERNAL'
+    script.script = text
+    
+    # No sockets means the compile failed (no OSL compiler, background mode, ...);
+    # wired up as is, the group would silently output 0
+    if not script.inputs:
+        print(f"[VLG] Could not compile {text_name}, using the node version")
+        bpy.data.node_groups.remove(group)
+        if created_text:
+            bpy.data.texts.remove(text)
+        return None
+    
+    input_node = nodes.new('NodeGroupInput')
+    output_node = nodes.new('NodeGroupOutput')
+    
+    group.update_tag()
+    
+    for index, socket in enumerate(script.inputs):
+        links.new(input_node.outputs[index], socket)
+    for index, socket in enumerate(script.outputs):
+        links.new(socket, output_node.inputs[index])
+    
+    return group
+
+
+# Group sockets: in 0 Normal, 1 Light Dir, 2 Half-Lambert | out 0 Diffuse
+def create_half_lambert_node_group(allow_osl=True):
     """
     Create Half-Lambert diffuse lighting node group.
     Source Engine's Half-Lambert wraps diffuse lighting around surfaces more.
     
     Formula: HalfLambert = (NdotL * 0.5 + 0.5) ^ 2
     """
-    group_name = "VLG_HalfLambert"
+    use_osl = allow_osl and _use_osl()
+    group_name = "VLG_HalfLambert" + ("_OSL" if use_osl else "")
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -25,76 +194,90 @@ def create_half_lambert_node_group():
     group.interface.new_socket(name="Half-Lambert", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Diffuse", in_out='OUTPUT', socket_type='NodeSocketFloat')
     
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_half_lambert')
+        return osl_group if osl_group is not None else create_half_lambert_node_group(allow_osl=False)
+    
     nodes = group.nodes
     links = group.links
     
     # Input/Output
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-600, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-600, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # Dot product: N . L
     dot = nodes.new('ShaderNodeVectorMath')
     dot.operation = 'DOT_PRODUCT'
-    dot.location = (-400, 0)
-    
-    # Scale by 0.5
-    scale = nodes.new('ShaderNodeMath')
-    scale.operation = 'MULTIPLY'
-    scale.location = (-200, 0)
-    scale.inputs[1].default_value = 0.5
+    if _SET_LOCATIONS:
+        dot.location = (-400, 0)
     
-    # Add 0.5
-    add = nodes.new('ShaderNodeMath')
-    add.operation = 'ADD'
-    add.location = (0, 0)
-    add.inputs[1].default_value = 0.5
+    # NdotL * 0.5 + 0.5 as a single multiply-add
+    wrap = nodes.new('ShaderNodeMath')
+    wrap.operation = 'MULTIPLY_ADD'
+    if _SET_LOCATIONS:
+        wrap.location = (-200, 0)
     
-    # Square (power 2)
-    power = nodes.new('ShaderNodeMath')
-    power.operation = 'POWER'
-    power.location = (200, 0)
-    power.inputs[1].default_value = 2.0
+    # Square (multiply by itself, cheaper than POWER)
+    square = nodes.new('ShaderNodeMath')
+    square.operation = 'MULTIPLY'
+    if _SET_LOCATIONS:
+        square.location = (100, 0)
     
     # Standard Lambert (just clamp NdotL)
     clamp = nodes.new('ShaderNodeClamp')
-    clamp.location = (-200, -150)
-    clamp.inputs['Min'].default_value = 0.0
-    clamp.inputs['Max'].default_value = 1.0
+    if _SET_LOCATIONS:
+        clamp.location = (-200, -150)
     
     # Mix between standard and half-lambert
     mix = nodes.new('ShaderNodeMix')
     mix.data_type = 'FLOAT'
-    mix.location = (400, 0)
+    if _SET_LOCATIONS:
+        mix.location = (400, 0)
+    
+    # Constant inputs
+    _apply_defaults((
+        (wrap, 1, 0.5),
+        (wrap, 2, 0.5),
+        (clamp, 1, 0.0),
+        (clamp, 2, 1.0),
+    ))
+    
+    group.update_tag()
     
     # Connect
-    links.new(input_node.outputs['Normal'], dot.inputs[0])
-    links.new(input_node.outputs['Light Dir'], dot.inputs[1])
-    links.new(dot.outputs['Value'], scale.inputs[0])
-    links.new(scale.outputs[0], add.inputs[0])
-    links.new(add.outputs[0], power.inputs[0])
-    links.new(dot.outputs['Value'], clamp.inputs['Value'])
-    links.new(input_node.outputs['Half-Lambert'], mix.inputs['Factor'])
-    links.new(clamp.outputs['Result'], mix.inputs['A'])
-    links.new(power.outputs[0], mix.inputs['B'])
-    links.new(mix.outputs['Result'], output_node.inputs['Diffuse'])
+    links.new(input_node.outputs[0], dot.inputs[0])
+    links.new(input_node.outputs[1], dot.inputs[1])
+    links.new(dot.outputs[1], wrap.inputs[0])
+    links.new(wrap.outputs[0], square.inputs[0])
+    links.new(wrap.outputs[0], square.inputs[1])
+    links.new(dot.outputs[1], clamp.inputs[0])
+    links.new(input_node.outputs[2], mix.inputs[0])
+    links.new(clamp.outputs[0], mix.inputs[2])
+    links.new(square.outputs[0], mix.inputs[3])
+    links.new(mix.outputs[0], output_node.inputs[0])
     
     return group
 
 
-def create_phong_fresnel_node_group():
+# Group sockets: in 0 NdotV, 1 Min, 2 Mid, 3 Max | out 0 Fresnel
+def create_phong_fresnel_node_group(allow_osl=True):
     """
     Create Phong Fresnel remapping node group.
     Source Engine uses $phongfresnelranges [min mid max] to remap fresnel.
     
     Formula: smoothstep(min, mid, 1-NdotV) * max
     """
-    group_name = "VLG_PhongFresnel"
+    use_osl = allow_osl and _use_osl()
+    group_name = "VLG_PhongFresnel" + ("_OSL" if use_osl else "")
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -105,56 +288,74 @@ def create_phong_fresnel_node_group():
     group.interface.new_socket(name="Max", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Fresnel", in_out='OUTPUT', socket_type='NodeSocketFloat')
     
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_phong_fresnel')
+        return osl_group if osl_group is not None else create_phong_fresnel_node_group(allow_osl=False)
+    
     nodes = group.nodes
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-600, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-600, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # 1 - NdotV
     invert = nodes.new('ShaderNodeMath')
     invert.operation = 'SUBTRACT'
-    invert.location = (-400, 0)
-    invert.inputs[0].default_value = 1.0
+    if _SET_LOCATIONS:
+        invert.location = (-400, 0)
     
     # Map range (smoothstep from min to mid)
     map_range = nodes.new('ShaderNodeMapRange')
-    map_range.location = (-100, 0)
+    if _SET_LOCATIONS:
+        map_range.location = (-100, 0)
     map_range.interpolation_type = 'SMOOTHSTEP'
-    map_range.inputs['To Min'].default_value = 0.0
-    map_range.inputs['To Max'].default_value = 1.0
     
     # Multiply by max
     multiply = nodes.new('ShaderNodeMath')
     multiply.operation = 'MULTIPLY'
-    multiply.location = (200, 0)
+    if _SET_LOCATIONS:
+        multiply.location = (200, 0)
+    
+    # Constant inputs
+    _apply_defaults((
+        (invert, 0, 1.0),
+        (map_range, 3, 0.0),
+        (map_range, 4, 1.0),
+    ))
+    
+    group.update_tag()
     
     # Connect
-    links.new(input_node.outputs['NdotV'], invert.inputs[1])
-    links.new(invert.outputs[0], map_range.inputs['Value'])
-    links.new(input_node.outputs['Min'], map_range.inputs['From Min'])
-    links.new(input_node.outputs['Mid'], map_range.inputs['From Max'])
-    links.new(map_range.outputs['Result'], multiply.inputs[0])
-    links.new(input_node.outputs['Max'], multiply.inputs[1])
-    links.new(multiply.outputs[0], output_node.inputs['Fresnel'])
+    links.new(input_node.outputs[0], invert.inputs[1])
+    links.new(invert.outputs[0], map_range.inputs[0])
+    links.new(input_node.outputs[1], map_range.inputs[1])
+    links.new(input_node.outputs[2], map_range.inputs[2])
+    links.new(map_range.outputs[0], multiply.inputs[0])
+    links.new(input_node.outputs[3], multiply.inputs[1])
+    links.new(multiply.outputs[0], output_node.inputs[0])
     
     return group
 
 
-def create_rim_light_node_group():
+# Group sockets: in 0 Normal, 1 View Vector, 2 Exponent, 3 Boost, 4 Mask | out 0 Rim
+def create_rim_light_node_group(allow_osl=True):
     """
     Create rim lighting node group.
     Source Engine rim light: (1 - NdotV)^exponent * boost
     
     Can be masked by $rimmask from phong exponent texture alpha.
     """
-    group_name = "VLG_RimLight"
+    use_osl = allow_osl and _use_osl()
+    group_name = "VLG_RimLight" + ("_OSL" if use_osl else "")
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -166,181 +367,411 @@ def create_rim_light_node_group():
     group.interface.new_socket(name="Mask", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Rim", in_out='OUTPUT', socket_type='NodeSocketFloat')
     
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_rim_light')
+        return osl_group if osl_group is not None else create_rim_light_node_group(allow_osl=False)
+    
     nodes = group.nodes
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-600, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-600, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # Dot product N.V
     dot = nodes.new('ShaderNodeVectorMath')
     dot.operation = 'DOT_PRODUCT'
-    dot.location = (-400, 0)
+    if _SET_LOCATIONS:
+        dot.location = (-400, 0)
     
-    # Clamp 0-1
-    clamp = nodes.new('ShaderNodeClamp')
-    clamp.location = (-200, 0)
-    
-    # 1 - NdotV
+    # 1 - NdotV, clamped 0-1 (same as 1 - clamp(NdotV, 0, 1))
     invert = nodes.new('ShaderNodeMath')
     invert.operation = 'SUBTRACT'
-    invert.location = (0, 0)
-    invert.inputs[0].default_value = 1.0
+    invert.use_clamp = True
+    if _SET_LOCATIONS:
+        invert.location = (0, 0)
     
     # Power by exponent
     power = nodes.new('ShaderNodeMath')
     power.operation = 'POWER'
-    power.location = (200, 0)
+    if _SET_LOCATIONS:
+        power.location = (200, 0)
     
     # Multiply by boost
     boost_mult = nodes.new('ShaderNodeMath')
     boost_mult.operation = 'MULTIPLY'
-    boost_mult.location = (350, 0)
+    if _SET_LOCATIONS:
+        boost_mult.location = (350, 0)
     
     # Multiply by mask
     mask_mult = nodes.new('ShaderNodeMath')
     mask_mult.operation = 'MULTIPLY'
-    mask_mult.location = (500, 0)
+    if _SET_LOCATIONS:
+        mask_mult.location = (500, 0)
+    
+    # Constant inputs
+    _apply_defaults((
+        (invert, 0, 1.0),
+    ))
+    
+    group.update_tag()
     
     # Connect
-    links.new(input_node.outputs['Normal'], dot.inputs[0])
-    links.new(input_node.outputs['View Vector'], dot.inputs[1])
-    links.new(dot.outputs['Value'], clamp.inputs['Value'])
-    links.new(clamp.outputs['Result'], invert.inputs[1])
+    links.new(input_node.outputs[0], dot.inputs[0])
+    links.new(input_node.outputs[1], dot.inputs[1])
+    links.new(dot.outputs[1], invert.inputs[1])
     links.new(invert.outputs[0], power.inputs[0])
-    links.new(input_node.outputs['Exponent'], power.inputs[1])
+    links.new(input_node.outputs[2], power.inputs[1])
     links.new(power.outputs[0], boost_mult.inputs[0])
-    links.new(input_node.outputs['Boost'], boost_mult.inputs[1])
+    links.new(input_node.outputs[3], boost_mult.inputs[1])
     links.new(boost_mult.outputs[0], mask_mult.inputs[0])
-    links.new(input_node.outputs['Mask'], mask_mult.inputs[1])
-    links.new(mask_mult.outputs[0], output_node.inputs['Rim'])
+    links.new(input_node.outputs[4], mask_mult.inputs[1])
+    links.new(mask_mult.outputs[0], output_node.inputs[0])
     
     return group
 
 
-def create_envmap_processing_node_group():
+# Group sockets: in 0 Envmap Color, 1 Tint, 2 Contrast, 3 Saturation | out 0 Result
+def create_envmap_processing_node_group(contrast_fixed=None, saturation_fixed=None, allow_osl=True):
     """
     Create environment map processing node group.
     Source Engine applies contrast and saturation to envmap samples.
     
     $envmapcontrast: lerp(envmap, envmap*envmap, contrast)
     $envmapsaturation: lerp(grayscale, envmap, saturation)
+    
+    Materials with static parameters can pass contrast_fixed/saturation_fixed
+    to get a specialized group: contrast 0 and saturation 1 are no-ops, so
+    those subgraphs are left out entirely. Fixed values also become the
+    defaults of the matching input sockets.
     """
+    use_osl = allow_osl and _use_osl()
     group_name = "VLG_EnvmapProcess"
+    if contrast_fixed is not None or saturation_fixed is not None:
+        group_name += f"_{contrast_fixed}_{saturation_fixed}"
+    if use_osl:
+        group_name += "_OSL"
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
     # Interface
     group.interface.new_socket(name="Envmap Color", in_out='INPUT', socket_type='NodeSocketColor')
     group.interface.new_socket(name="Tint", in_out='INPUT', socket_type='NodeSocketColor')
-    group.interface.new_socket(name="Contrast", in_out='INPUT', socket_type='NodeSocketFloat')
-    group.interface.new_socket(name="Saturation", in_out='INPUT', socket_type='NodeSocketFloat')
+    contrast_socket = group.interface.new_socket(name="Contrast", in_out='INPUT', socket_type='NodeSocketFloat')
+    saturation_socket = group.interface.new_socket(name="Saturation", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Result", in_out='OUTPUT', socket_type='NodeSocketColor')
     
+    if contrast_fixed is not None:
+        contrast_socket.default_value = contrast_fixed
+    if saturation_fixed is not None:
+        saturation_socket.default_value = saturation_fixed
+    
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_envmap_process')
+        if osl_group is not None:
+            return osl_group
+        return create_envmap_processing_node_group(contrast_fixed, saturation_fixed, allow_osl=False)
+    
+    skip_contrast = contrast_fixed == 0.0
+    skip_saturation = saturation_fixed == 1.0
+    
     nodes = group.nodes
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-800, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-800, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # Apply tint
     tint_mult = nodes.new('ShaderNodeMix')
     tint_mult.data_type = 'RGBA'
     tint_mult.blend_type = 'MULTIPLY'
-    tint_mult.location = (-500, 0)
-    tint_mult.inputs['Factor'].default_value = 1.0
-    
-    # Square for contrast
-    contrast_square = nodes.new('ShaderNodeMix')
-    contrast_square.data_type = 'RGBA'
-    contrast_square.blend_type = 'MULTIPLY'
-    contrast_square.location = (-200, -100)
-    contrast_square.inputs['Factor'].default_value = 1.0
-    
-    # Lerp between normal and squared (contrast)
-    contrast_mix = nodes.new('ShaderNodeMix')
-    contrast_mix.data_type = 'RGBA'
-    contrast_mix.location = (0, 0)
-    
-    # Convert to grayscale for saturation
-    # Luminance: 0.299*R + 0.587*G + 0.114*B
-    separate = nodes.new('ShaderNodeSeparateColor')
-    separate.location = (-200, -300)
-    
-    lum_r = nodes.new('ShaderNodeMath')
-    lum_r.operation = 'MULTIPLY'
-    lum_r.location = (0, -250)
-    lum_r.inputs[1].default_value = 0.299
-    
-    lum_g = nodes.new('ShaderNodeMath')
-    lum_g.operation = 'MULTIPLY'
-    lum_g.location = (0, -350)
-    lum_g.inputs[1].default_value = 0.587
-    
-    lum_b = nodes.new('ShaderNodeMath')
-    lum_b.operation = 'MULTIPLY'
-    lum_b.location = (0, -450)
-    lum_b.inputs[1].default_value = 0.114
-    
-    add_rg = nodes.new('ShaderNodeMath')
-    add_rg.operation = 'ADD'
-    add_rg.location = (150, -300)
-    
-    add_rgb = nodes.new('ShaderNodeMath')
-    add_rgb.operation = 'ADD'
-    add_rgb.location = (300, -350)
-    
-    # Convert luminance to grayscale color
-    gray_combine = nodes.new('ShaderNodeCombineColor')
-    gray_combine.location = (200, -450)
-    
-    # Lerp between grayscale and color (saturation)
-    sat_mix = nodes.new('ShaderNodeMix')
-    sat_mix.data_type = 'RGBA'
-    sat_mix.location = (400, 0)
-    
-    # Connect tint
-    links.new(input_node.outputs['Envmap Color'], tint_mult.inputs['A'])
-    links.new(input_node.outputs['Tint'], tint_mult.inputs['B'])
-    
-    # Connect contrast
-    links.new(tint_mult.outputs['Result'], contrast_square.inputs['A'])
-    links.new(tint_mult.outputs['Result'], contrast_square.inputs['B'])
-    links.new(input_node.outputs['Contrast'], contrast_mix.inputs['Factor'])
-    links.new(tint_mult.outputs['Result'], contrast_mix.inputs['A'])
-    links.new(contrast_square.outputs['Result'], contrast_mix.inputs['B'])
-    
-    # Connect saturation
-    links.new(contrast_mix.outputs['Result'], separate.inputs['Color'])
-    links.new(separate.outputs['Red'], lum_r.inputs[0])
-    links.new(separate.outputs['Green'], lum_g.inputs[0])
-    links.new(separate.outputs['Blue'], lum_b.inputs[0])
-    links.new(lum_r.outputs[0], add_rg.inputs[0])
-    links.new(lum_g.outputs[0], add_rg.inputs[1])
-    links.new(add_rg.outputs[0], add_rgb.inputs[0])
-    links.new(lum_b.outputs[0], add_rgb.inputs[1])
-    links.new(add_rgb.outputs[0], gray_combine.inputs['Red'])
-    links.new(add_rgb.outputs[0], gray_combine.inputs['Green'])
-    links.new(add_rgb.outputs[0], gray_combine.inputs['Blue'])
-    
-    links.new(input_node.outputs['Saturation'], sat_mix.inputs['Factor'])
-    links.new(gray_combine.outputs['Color'], sat_mix.inputs['A'])
-    links.new(contrast_mix.outputs['Result'], sat_mix.inputs['B'])
-    
-    links.new(sat_mix.outputs['Result'], output_node.inputs['Result'])
+    if _SET_LOCATIONS:
+        tint_mult.location = (-500, 0)
+    
+    defaults = [(tint_mult, 0, 1.0)]
+    connections = [
+        (input_node.outputs[0], tint_mult.inputs[6]),
+        (input_node.outputs[1], tint_mult.inputs[7]),
+    ]
+    contrasted = tint_mult.outputs[2]
+    
+    if not skip_contrast:
+        # Square for contrast
+        contrast_square = nodes.new('ShaderNodeMix')
+        contrast_square.data_type = 'RGBA'
+        contrast_square.blend_type = 'MULTIPLY'
+        if _SET_LOCATIONS:
+            contrast_square.location = (-200, -100)
+        
+        # Lerp between normal and squared (contrast)
+        contrast_mix = nodes.new('ShaderNodeMix')
+        contrast_mix.data_type = 'RGBA'
+        if _SET_LOCATIONS:
+            contrast_mix.location = (0, 0)
+        
+        defaults.append((contrast_square, 0, 1.0))
+        connections += [
+            (tint_mult.outputs[2], contrast_square.inputs[6]),
+            (tint_mult.outputs[2], contrast_square.inputs[7]),
+            (input_node.outputs[2], contrast_mix.inputs[0]),
+            (tint_mult.outputs[2], contrast_mix.inputs[6]),
+            (contrast_square.outputs[2], contrast_mix.inputs[7]),
+        ]
+        contrasted = contrast_mix.outputs[2]
+    
+    if skip_saturation:
+        connections.append((contrasted, output_node.inputs[0]))
+    else:
+        # Convert to grayscale for saturation
+        # Luminance: 0.299*R + 0.587*G + 0.114*B
+        separate = nodes.new('ShaderNodeSeparateColor')
+        if _SET_LOCATIONS:
+            separate.location = (-200, -300)
+        
+        lum_r = nodes.new('ShaderNodeMath')
+        lum_r.operation = 'MULTIPLY'
+        if _SET_LOCATIONS:
+            lum_r.location = (0, -250)
+        
+        lum_g = nodes.new('ShaderNodeMath')
+        lum_g.operation = 'MULTIPLY'
+        if _SET_LOCATIONS:
+            lum_g.location = (0, -350)
+        
+        lum_b = nodes.new('ShaderNodeMath')
+        lum_b.operation = 'MULTIPLY'
+        if _SET_LOCATIONS:
+            lum_b.location = (0, -450)
+        
+        add_rg = nodes.new('ShaderNodeMath')
+        add_rg.operation = 'ADD'
+        if _SET_LOCATIONS:
+            add_rg.location = (150, -300)
+        
+        add_rgb = nodes.new('ShaderNodeMath')
+        add_rgb.operation = 'ADD'
+        if _SET_LOCATIONS:
+            add_rgb.location = (300, -350)
+        
+        # Convert luminance to grayscale color
+        gray_combine = nodes.new('ShaderNodeCombineColor')
+        if _SET_LOCATIONS:
+            gray_combine.location = (200, -450)
+        
+        # Lerp between grayscale and color (saturation)
+        sat_mix = nodes.new('ShaderNodeMix')
+        sat_mix.data_type = 'RGBA'
+        if _SET_LOCATIONS:
+            sat_mix.location = (400, 0)
+        
+        defaults += [
+            (lum_r, 1, 0.299),
+            (lum_g, 1, 0.587),
+            (lum_b, 1, 0.114),
+        ]
+        connections += [
+            (contrasted, separate.inputs[0]),
+            (separate.outputs[0], lum_r.inputs[0]),
+            (separate.outputs[1], lum_g.inputs[0]),
+            (separate.outputs[2], lum_b.inputs[0]),
+            (lum_r.outputs[0], add_rg.inputs[0]),
+            (lum_g.outputs[0], add_rg.inputs[1]),
+            (add_rg.outputs[0], add_rgb.inputs[0]),
+            (lum_b.outputs[0], add_rgb.inputs[1]),
+            (add_rgb.outputs[0], gray_combine.inputs[0]),
+            (add_rgb.outputs[0], gray_combine.inputs[1]),
+            (add_rgb.outputs[0], gray_combine.inputs[2]),
+            (input_node.outputs[3], sat_mix.inputs[0]),
+            (gray_combine.outputs[0], sat_mix.inputs[6]),
+            (contrasted, sat_mix.inputs[7]),
+            (sat_mix.outputs[2], output_node.inputs[0]),
+        ]
+    
+    _apply_defaults(defaults)
+    
+    group.update_tag()
+    
+    for from_socket, to_socket in connections:
+        links.new(from_socket, to_socket)
     
     return group
 
 
+def _build_detail_mod2x(group, input_node, output_node, tint):
+    """Mod2X: detail * 2 multiplied with base, so gray (0.5) leaves base unchanged."""
+    nodes = group.nodes
+    
+    scale2 = nodes.new('ShaderNodeMix')
+    scale2.data_type = 'RGBA'
+    scale2.blend_type = 'ADD'
+    if _SET_LOCATIONS:
+        scale2.location = (-100, 0)
+    
+    mult = nodes.new('ShaderNodeMix')
+    mult.data_type = 'RGBA'
+    mult.blend_type = 'MULTIPLY'
+    if _SET_LOCATIONS:
+        mult.location = (100, 0)
+    
+    final_mix = nodes.new('ShaderNodeMix')
+    final_mix.data_type = 'RGBA'
+    if _SET_LOCATIONS:
+        final_mix.location = (300, 0)
+    
+    defaults = [
+        (scale2, 0, 1.0),
+        (mult, 0, 1.0),
+    ]
+    connections = [
+        (tint.outputs[2], scale2.inputs[6]),
+        (tint.outputs[2], scale2.inputs[7]),
+        (input_node.outputs[0], mult.inputs[6]),
+        (scale2.outputs[2], mult.inputs[7]),
+        (input_node.outputs[3], final_mix.inputs[0]),
+        (input_node.outputs[0], final_mix.inputs[6]),
+        (mult.outputs[2], final_mix.inputs[7]),
+        (final_mix.outputs[2], output_node.inputs[0]),
+    ]
+    
+    return defaults, connections
+
+
+def _build_detail_additive(group, input_node, output_node, tint):
+    """Additive: base + detail * blend factor."""
+    nodes = group.nodes
+    
+    add = nodes.new('ShaderNodeMix')
+    add.data_type = 'RGBA'
+    add.blend_type = 'ADD'
+    if _SET_LOCATIONS:
+        add.location = (0, 0)
+    
+    scale = nodes.new('ShaderNodeMix')
+    scale.data_type = 'RGBA'
+    if _SET_LOCATIONS:
+        scale.location = (-100, -100)
+    
+    defaults = [
+        (add, 0, 1.0),
+        (scale, 6, (0, 0, 0, 1)),
+    ]
+    connections = [
+        (input_node.outputs[3], scale.inputs[0]),
+        (tint.outputs[2], scale.inputs[7]),
+        (input_node.outputs[0], add.inputs[6]),
+        (scale.outputs[2], add.inputs[7]),
+        (add.outputs[2], output_node.inputs[0]),
+    ]
+    
+    return defaults, connections
+
+
+def _build_detail_alpha_blend(group, input_node, output_node, tint):
+    """Alpha blend: lerp(base, detail, detail alpha * blend factor)."""
+    nodes = group.nodes
+    
+    alpha_blend = nodes.new('ShaderNodeMix')
+    alpha_blend.data_type = 'RGBA'
+    if _SET_LOCATIONS:
+        alpha_blend.location = (100, 0)
+    
+    factor_mult = nodes.new('ShaderNodeMath')
+    factor_mult.operation = 'MULTIPLY'
+    if _SET_LOCATIONS:
+        factor_mult.location = (-100, -100)
+    
+    connections = [
+        (input_node.outputs[2], factor_mult.inputs[0]),
+        (input_node.outputs[3], factor_mult.inputs[1]),
+        (factor_mult.outputs[0], alpha_blend.inputs[0]),
+        (input_node.outputs[0], alpha_blend.inputs[6]),
+        (tint.outputs[2], alpha_blend.inputs[7]),
+        (alpha_blend.outputs[2], output_node.inputs[0]),
+    ]
+    
+    return [], connections
+
+
+def _build_detail_lerp(group, input_node, output_node, tint):
+    """Crossfade: lerp(base, detail, blend factor)."""
+    nodes = group.nodes
+    
+    lerp = nodes.new('ShaderNodeMix')
+    lerp.data_type = 'RGBA'
+    if _SET_LOCATIONS:
+        lerp.location = (100, 0)
+    
+    connections = [
+        (input_node.outputs[3], lerp.inputs[0]),
+        (input_node.outputs[0], lerp.inputs[6]),
+        (tint.outputs[2], lerp.inputs[7]),
+        (lerp.outputs[2], output_node.inputs[0]),
+    ]
+    
+    return [], connections
+
+
+def _build_detail_multiply(group, input_node, output_node, tint):
+    """Multiply: lerp(base, base * detail, blend factor)."""
+    nodes = group.nodes
+    
+    mult = nodes.new('ShaderNodeMix')
+    mult.data_type = 'RGBA'
+    mult.blend_type = 'MULTIPLY'
+    if _SET_LOCATIONS:
+        mult.location = (0, 0)
+    
+    final_mix = nodes.new('ShaderNodeMix')
+    final_mix.data_type = 'RGBA'
+    if _SET_LOCATIONS:
+        final_mix.location = (200, 0)
+    
+    defaults = [
+        (mult, 0, 1.0),
+    ]
+    connections = [
+        (input_node.outputs[0], mult.inputs[6]),
+        (tint.outputs[2], mult.inputs[7]),
+        (input_node.outputs[3], final_mix.inputs[0]),
+        (input_node.outputs[0], final_mix.inputs[6]),
+        (mult.outputs[2], final_mix.inputs[7]),
+        (final_mix.outputs[2], output_node.inputs[0]),
+    ]
+    
+    return defaults, connections
+
+
+def _build_detail_passthrough(group, input_node, output_node, tint):
+    """Unsupported modes pass the base color through unchanged."""
+    return [], [(input_node.outputs[0], output_node.inputs[0])]
+
+
+# Detail blend mode -> builder. Each builder adds its mode's nodes to the group
+# and returns the (defaults, connections) it needs applied.
+_DETAIL_BLEND_BUILDERS = {
+    0: _build_detail_mod2x,
+    1: _build_detail_additive,
+    2: _build_detail_alpha_blend,
+    3: _build_detail_lerp,
+    4: _build_detail_multiply,
+}
+
+
+# Group sockets: in 0 Base Color, 1 Detail Color, 2 Detail Alpha, 3 Blend Factor,
+#                4 Detail Tint | out 0 Result
 def create_detail_blend_node_group(blend_mode=0):
     """
     Create detail texture blending node group.
@@ -354,8 +785,9 @@ def create_detail_blend_node_group(blend_mode=0):
     """
     group_name = f"VLG_DetailBlend_{blend_mode}"
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -371,128 +803,57 @@ def create_detail_blend_node_group(blend_mode=0):
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-600, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-600, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # Apply detail tint
     tint = nodes.new('ShaderNodeMix')
     tint.data_type = 'RGBA'
     tint.blend_type = 'MULTIPLY'
-    tint.location = (-300, 0)
-    tint.inputs['Factor'].default_value = 1.0
-    
-    links.new(input_node.outputs['Detail Color'], tint.inputs['A'])
-    links.new(input_node.outputs['Detail Tint'], tint.inputs['B'])
-    
-    if blend_mode == 0:  # Mod2X
-        # detail * 2, then multiply with base
-        # gray (0.5) becomes 1.0, so no change
-        scale2 = nodes.new('ShaderNodeMix')
-        scale2.data_type = 'RGBA'
-        scale2.blend_type = 'ADD'
-        scale2.location = (-100, 0)
-        scale2.inputs['Factor'].default_value = 1.0
-        
-        mult = nodes.new('ShaderNodeMix')
-        mult.data_type = 'RGBA'
-        mult.blend_type = 'MULTIPLY'
-        mult.location = (100, 0)
-        mult.inputs['Factor'].default_value = 1.0
-        
-        final_mix = nodes.new('ShaderNodeMix')
-        final_mix.data_type = 'RGBA'
-        final_mix.location = (300, 0)
-        
-        links.new(tint.outputs['Result'], scale2.inputs['A'])
-        links.new(tint.outputs['Result'], scale2.inputs['B'])
-        links.new(input_node.outputs['Base Color'], mult.inputs['A'])
-        links.new(scale2.outputs['Result'], mult.inputs['B'])
-        links.new(input_node.outputs['Blend Factor'], final_mix.inputs['Factor'])
-        links.new(input_node.outputs['Base Color'], final_mix.inputs['A'])
-        links.new(mult.outputs['Result'], final_mix.inputs['B'])
-        links.new(final_mix.outputs['Result'], output_node.inputs['Result'])
-        
-    elif blend_mode == 1:  # Additive
-        add = nodes.new('ShaderNodeMix')
-        add.data_type = 'RGBA'
-        add.blend_type = 'ADD'
-        add.location = (0, 0)
-        
-        scale = nodes.new('ShaderNodeMix')
-        scale.data_type = 'RGBA'
-        scale.location = (-100, -100)
-        
-        links.new(input_node.outputs['Blend Factor'], scale.inputs['Factor'])
-        scale.inputs['A'].default_value = (0, 0, 0, 1)
-        links.new(tint.outputs['Result'], scale.inputs['B'])
-        links.new(input_node.outputs['Base Color'], add.inputs['A'])
-        links.new(scale.outputs['Result'], add.inputs['B'])
-        add.inputs['Factor'].default_value = 1.0
-        links.new(add.outputs['Result'], output_node.inputs['Result'])
-        
-    elif blend_mode == 2:  # Alpha blend
-        alpha_blend = nodes.new('ShaderNodeMix')
-        alpha_blend.data_type = 'RGBA'
-        alpha_blend.location = (100, 0)
-        
-        factor_mult = nodes.new('ShaderNodeMath')
-        factor_mult.operation = 'MULTIPLY'
-        factor_mult.location = (-100, -100)
-        
-        links.new(input_node.outputs['Detail Alpha'], factor_mult.inputs[0])
-        links.new(input_node.outputs['Blend Factor'], factor_mult.inputs[1])
-        links.new(factor_mult.outputs[0], alpha_blend.inputs['Factor'])
-        links.new(input_node.outputs['Base Color'], alpha_blend.inputs['A'])
-        links.new(tint.outputs['Result'], alpha_blend.inputs['B'])
-        links.new(alpha_blend.outputs['Result'], output_node.inputs['Result'])
-        
-    elif blend_mode == 3:  # Crossfade/Lerp
-        lerp = nodes.new('ShaderNodeMix')
-        lerp.data_type = 'RGBA'
-        lerp.location = (100, 0)
-        
-        links.new(input_node.outputs['Blend Factor'], lerp.inputs['Factor'])
-        links.new(input_node.outputs['Base Color'], lerp.inputs['A'])
-        links.new(tint.outputs['Result'], lerp.inputs['B'])
-        links.new(lerp.outputs['Result'], output_node.inputs['Result'])
-        
-    elif blend_mode == 4:  # Multiply
-        mult = nodes.new('ShaderNodeMix')
-        mult.data_type = 'RGBA'
-        mult.blend_type = 'MULTIPLY'
-        mult.location = (0, 0)
-        
-        final_mix = nodes.new('ShaderNodeMix')
-        final_mix.data_type = 'RGBA'
-        final_mix.location = (200, 0)
-        
-        links.new(input_node.outputs['Base Color'], mult.inputs['A'])
-        links.new(tint.outputs['Result'], mult.inputs['B'])
-        mult.inputs['Factor'].default_value = 1.0
-        links.new(input_node.outputs['Blend Factor'], final_mix.inputs['Factor'])
-        links.new(input_node.outputs['Base Color'], final_mix.inputs['A'])
-        links.new(mult.outputs['Result'], final_mix.inputs['B'])
-        links.new(final_mix.outputs['Result'], output_node.inputs['Result'])
+    if _SET_LOCATIONS:
+        tint.location = (-300, 0)
     
-    else:  # Default to mod2x
-        links.new(input_node.outputs['Base Color'], output_node.inputs['Result'])
+    # Constants and links are collected per mode and applied in that order
+    defaults = [(tint, 0, 1.0)]
+    connections = [
+        (input_node.outputs[1], tint.inputs[6]),
+        (input_node.outputs[4], tint.inputs[7]),
+    ]
+    
+    build_mode = _DETAIL_BLEND_BUILDERS.get(blend_mode, _build_detail_passthrough)
+    mode_defaults, mode_connections = build_mode(group, input_node, output_node, tint)
+    defaults += mode_defaults
+    connections += mode_connections
+    
+    _apply_defaults(defaults)
+    
+    group.update_tag()
+    
+    for from_socket, to_socket in connections:
+        links.new(from_socket, to_socket)
     
     return group
 
 
-def create_selfillum_fresnel_node_group():
+# Group sockets: in 0 Normal, 1 View Vector, 2 Min (Bias), 3 Max (Scale), 4 Exponent
+#                | out 0 Fresnel
+def create_selfillum_fresnel_node_group(allow_osl=True):
     """
     Create self-illumination fresnel node group.
     Source Engine $selfillumfresnel with $selfillumfresnelminmaxexp
     
     Formula: clamp((NdotV^exp * scale) + bias, 0, 1)
     """
-    group_name = "VLG_SelfIllumFresnel"
+    use_osl = allow_osl and _use_osl()
+    group_name = "VLG_SelfIllumFresnel" + ("_OSL" if use_osl else "")
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -504,115 +865,100 @@ def create_selfillum_fresnel_node_group():
     group.interface.new_socket(name="Exponent", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Fresnel", in_out='OUTPUT', socket_type='NodeSocketFloat')
     
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_selfillum_fresnel')
+        return osl_group if osl_group is not None else create_selfillum_fresnel_node_group(allow_osl=False)
+    
     nodes = group.nodes
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-600, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-600, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (600, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (600, 0)
     
     # N.V
     dot = nodes.new('ShaderNodeVectorMath')
     dot.operation = 'DOT_PRODUCT'
-    dot.location = (-400, 0)
+    if _SET_LOCATIONS:
+        dot.location = (-400, 0)
     
     # Clamp 0-1
-    clamp1 = nodes.new('ShaderNodeClamp')
-    clamp1.location = (-200, 0)
+    clamp1 = nodes.new('ShaderNodeMath')
+    clamp1.operation = 'MAXIMUM'
+    clamp1.use_clamp = True
+    if _SET_LOCATIONS:
+        clamp1.location = (-200, 0)
     
     # Power
     power = nodes.new('ShaderNodeMath')
     power.operation = 'POWER'
-    power.location = (0, 0)
+    if _SET_LOCATIONS:
+        power.location = (0, 0)
     
-    # Scale
-    scale = nodes.new('ShaderNodeMath')
-    scale.operation = 'MULTIPLY'
-    scale.location = (150, 0)
+    # Scale and add bias in one node (with final clamp)
+    scale_bias = nodes.new('ShaderNodeMath')
+    scale_bias.operation = 'MULTIPLY_ADD'
+    scale_bias.use_clamp = True
+    if _SET_LOCATIONS:
+        scale_bias.location = (200, 0)
     
-    # Add bias
-    add = nodes.new('ShaderNodeMath')
-    add.operation = 'ADD'
-    add.location = (300, 0)
+    # Constant inputs
+    _apply_defaults((
+        (clamp1, 1, 0.0),
+    ))
     
-    # Final clamp
-    clamp2 = nodes.new('ShaderNodeClamp')
-    clamp2.location = (450, 0)
+    group.update_tag()
     
     # Connect
-    links.new(input_node.outputs['Normal'], dot.inputs[0])
-    links.new(input_node.outputs['View Vector'], dot.inputs[1])
-    links.new(dot.outputs['Value'], clamp1.inputs['Value'])
-    links.new(clamp1.outputs['Result'], power.inputs[0])
-    links.new(input_node.outputs['Exponent'], power.inputs[1])
-    links.new(power.outputs[0], scale.inputs[0])
-    links.new(input_node.outputs['Max (Scale)'], scale.inputs[1])
-    links.new(scale.outputs[0], add.inputs[0])
-    links.new(input_node.outputs['Min (Bias)'], add.inputs[1])
-    links.new(add.outputs[0], clamp2.inputs['Value'])
-    links.new(clamp2.outputs['Result'], output_node.inputs['Fresnel'])
+    links.new(input_node.outputs[0], dot.inputs[0])
+    links.new(input_node.outputs[1], dot.inputs[1])
+    links.new(dot.outputs[1], clamp1.inputs[0])
+    links.new(clamp1.outputs[0], power.inputs[0])
+    links.new(input_node.outputs[4], power.inputs[1])
+    links.new(power.outputs[0], scale_bias.inputs[0])
+    links.new(input_node.outputs[3], scale_bias.inputs[1])
+    links.new(input_node.outputs[2], scale_bias.inputs[2])
+    links.new(scale_bias.outputs[0], output_node.inputs[0])
     
     return group
 
 
-def create_light_warp_node_group():
+# Separate Color sockets: in 0 Color | out 0 Red
+def add_light_warp(tree, warp_color_socket):
     """
-    Create light warp node group.
+    Insert the light warp lookup directly into a shader tree.
     Source Engine $lightwarptexture remaps diffuse lighting for toon-style effects.
     
-    The texture is sampled using the diffuse term as the U coordinate.
+    The texture is sampled using the diffuse term as the U coordinate, so by the
+    time it reaches us the warped diffuse is just the red channel of the sample.
+    Light warp is a single Separate Color node, so it is added inline instead of
+    being wrapped in a node group.
+    Returns the output socket carrying the warped diffuse value.
     """
-    group_name = "VLG_LightWarp"
-    
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
-    
-    group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
-    
-    # Interface
-    group.interface.new_socket(name="Diffuse", in_out='INPUT', socket_type='NodeSocketFloat')
-    group.interface.new_socket(name="Warp Texture", in_out='INPUT', socket_type='NodeSocketColor')
-    group.interface.new_socket(name="Warped Diffuse", in_out='OUTPUT', socket_type='NodeSocketFloat')
-    
-    nodes = group.nodes
-    links = group.links
-    
-    input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-400, 0)
-    
-    output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (400, 0)
-    
-    # The warp texture is already sampled, so we just use it as the diffuse value
-    # In practice, you'd combine the UV with the diffuse value
-    # For Blender, we can use a color ramp as an approximation
-    
-    # Separate to get red channel (usually sufficient for 1D warp)
-    separate = nodes.new('ShaderNodeSeparateColor')
-    separate.location = (0, 0)
-    
-    # Or we could just pass through the diffuse if no warp texture
-    # For now, use the warp texture's red channel
-    
-    links.new(input_node.outputs['Warp Texture'], separate.inputs['Color'])
-    links.new(separate.outputs['Red'], output_node.inputs['Warped Diffuse'])
-    
-    return group
+    separate = tree.nodes.new('ShaderNodeSeparateColor')
+    tree.links.new(warp_color_socket, separate.inputs[0])
+    return separate.outputs[0]
 
 
-def create_phong_specular_node_group():
+# Group sockets: in 0 Normal, 1 View Vector, 2 Light Vector, 3 Exponent, 4 Boost,
+#                5 Mask, 6 Fresnel Factor | out 0 Specular
+def create_phong_specular_node_group(allow_osl=True):
     """
     Create Phong specular highlighting node group.
     Source Engine Phong: (R.V)^exponent * boost * mask
     
     Where R = reflect(-L, N) and V = view direction
     """
-    group_name = "VLG_PhongSpecular"
+    use_osl = allow_osl and _use_osl()
+    group_name = "VLG_PhongSpecular" + ("_OSL" if use_osl else "")
     
-    if group_name in bpy.data.node_groups:
-        return bpy.data.node_groups[group_name]
+    existing = bpy.data.node_groups.get(group_name)
+    if existing is not None:
+        return existing
     
     group = bpy.data.node_groups.new(group_name, 'ShaderNodeTree')
     
@@ -626,84 +972,108 @@ def create_phong_specular_node_group():
     group.interface.new_socket(name="Fresnel Factor", in_out='INPUT', socket_type='NodeSocketFloat')
     group.interface.new_socket(name="Specular", in_out='OUTPUT', socket_type='NodeSocketFloat')
     
+    if use_osl:
+        osl_group = _build_osl_group(group, 'vlg_phong_specular')
+        return osl_group if osl_group is not None else create_phong_specular_node_group(allow_osl=False)
+    
     nodes = group.nodes
     links = group.links
     
     input_node = nodes.new('NodeGroupInput')
-    input_node.location = (-800, 0)
+    if _SET_LOCATIONS:
+        input_node.location = (-800, 0)
     
     output_node = nodes.new('NodeGroupOutput')
-    output_node.location = (800, 0)
+    if _SET_LOCATIONS:
+        output_node.location = (800, 0)
     
     # Negate light vector
     negate = nodes.new('ShaderNodeVectorMath')
     negate.operation = 'SCALE'
-    negate.location = (-600, 0)
-    negate.inputs['Scale'].default_value = -1.0
+    if _SET_LOCATIONS:
+        negate.location = (-600, 0)
     
     # Reflect
     reflect = nodes.new('ShaderNodeVectorMath')
     reflect.operation = 'REFLECT'
-    reflect.location = (-400, 0)
+    if _SET_LOCATIONS:
+        reflect.location = (-400, 0)
     
     # R.V
     dot = nodes.new('ShaderNodeVectorMath')
     dot.operation = 'DOT_PRODUCT'
-    dot.location = (-200, 0)
+    if _SET_LOCATIONS:
+        dot.location = (-200, 0)
     
     # Clamp
-    clamp = nodes.new('ShaderNodeClamp')
-    clamp.location = (0, 0)
+    clamp = nodes.new('ShaderNodeMath')
+    clamp.operation = 'MAXIMUM'
+    clamp.use_clamp = True
+    if _SET_LOCATIONS:
+        clamp.location = (0, 0)
     
     # Power by exponent
     power = nodes.new('ShaderNodeMath')
     power.operation = 'POWER'
-    power.location = (150, 0)
+    if _SET_LOCATIONS:
+        power.location = (150, 0)
     
     # Multiply by boost
     boost = nodes.new('ShaderNodeMath')
     boost.operation = 'MULTIPLY'
-    boost.location = (300, 0)
+    if _SET_LOCATIONS:
+        boost.location = (300, 0)
     
     # Multiply by mask
     mask = nodes.new('ShaderNodeMath')
     mask.operation = 'MULTIPLY'
-    mask.location = (450, 0)
+    if _SET_LOCATIONS:
+        mask.location = (450, 0)
     
     # Multiply by fresnel
     fresnel = nodes.new('ShaderNodeMath')
     fresnel.operation = 'MULTIPLY'
-    fresnel.location = (600, 0)
+    if _SET_LOCATIONS:
+        fresnel.location = (600, 0)
+    
+    # Constant inputs
+    _apply_defaults((
+        (negate, 3, -1.0),
+        (clamp, 1, 0.0),
+    ))
+    
+    group.update_tag()
     
     # Connect
-    links.new(input_node.outputs['Light Vector'], negate.inputs['Vector'])
-    links.new(negate.outputs['Vector'], reflect.inputs[0])
-    links.new(input_node.outputs['Normal'], reflect.inputs[1])
-    links.new(reflect.outputs['Vector'], dot.inputs[0])
-    links.new(input_node.outputs['View Vector'], dot.inputs[1])
-    links.new(dot.outputs['Value'], clamp.inputs['Value'])
-    links.new(clamp.outputs['Result'], power.inputs[0])
-    links.new(input_node.outputs['Exponent'], power.inputs[1])
+    links.new(input_node.outputs[2], negate.inputs[0])
+    links.new(negate.outputs[0], reflect.inputs[0])
+    links.new(input_node.outputs[0], reflect.inputs[1])
+    links.new(reflect.outputs[0], dot.inputs[0])
+    links.new(input_node.outputs[1], dot.inputs[1])
+    links.new(dot.outputs[1], clamp.inputs[0])
+    links.new(clamp.outputs[0], power.inputs[0])
+    links.new(input_node.outputs[3], power.inputs[1])
     links.new(power.outputs[0], boost.inputs[0])
-    links.new(input_node.outputs['Boost'], boost.inputs[1])
+    links.new(input_node.outputs[4], boost.inputs[1])
     links.new(boost.outputs[0], mask.inputs[0])
-    links.new(input_node.outputs['Mask'], mask.inputs[1])
+    links.new(input_node.outputs[5], mask.inputs[1])
     links.new(mask.outputs[0], fresnel.inputs[0])
-    links.new(input_node.outputs['Fresnel Factor'], fresnel.inputs[1])
-    links.new(fresnel.outputs[0], output_node.inputs['Specular'])
+    links.new(input_node.outputs[6], fresnel.inputs[1])
+    links.new(fresnel.outputs[0], output_node.inputs[0])
     
     return group
 
 
 def create_all_vlg_node_groups():
     """Create all VertexLitGeneric node groups."""
-    create_half_lambert_node_group()
-    create_phong_fresnel_node_group()
-    create_rim_light_node_group()
-    create_envmap_processing_node_group()
-    create_selfillum_fresnel_node_group()
-    create_light_warp_node_group()
-    create_phong_specular_node_group()
+    # Nothing links the pre-built groups, so skip the OSL variants and the
+    # Text datablocks they would add; a caller that links a group builds it itself
+    create_half_lambert_node_group(allow_osl=False)
+    create_phong_fresnel_node_group(allow_osl=False)
+    create_rim_light_node_group(allow_osl=False)
+    create_envmap_processing_node_group(allow_osl=False)
+    create_selfillum_fresnel_node_group(allow_osl=False)
+    create_phong_specular_node_group(allow_osl=False)
     
     # Create all detail blend modes
     for mode in range(5):
@@ -1,9 +1,130 @@
 # SourceIO Integration for BlenderVertexLitGeneric
 # This module adds a "Import MDL (Softlamps)" operator that uses our material pipeline
 
+import logging
+import json
+import os
+import re
+from sys import intern
+
 import bpy
 from bpy.props import BoolProperty, CollectionProperty, StringProperty
 
+# VMT key/value pair: "$key" "value" or $key value, one per line (findall over the whole VMT)
+# Note: [^\S\n]* allows zero or more whitespace without crossing lines
+# (some VMTs have no space like "$key""value")
+# An unquoted value ends at its last non-blank character, so trailing whitespace
+# on the line is never taken as a value.
+# Also acts as the line classifier: blank lines, // comments and braces never match
+_KV_RE = re.compile(r'^[^\S\n]*["\']?\$?(\w+)["\']?[^\S\n]*["\']?'
+                    r'([^"\'\n]*[^"\'\s]|[^"\'\n]+(?=["\']))',
+                    re.IGNORECASE | re.MULTILINE)
+# VMT vector value: "[r g b]" or "r g b"
+_VEC_RE = re.compile(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?')
+# Start of a "Proxies" { ... } block, up to and including its opening brace
+_PROXIES_RE = re.compile(r'["\']?proxies["\']?\s*\{', re.IGNORECASE)
+
+# VMT keys handled by parse_vmt_with_cm, grouped by value type.
+# Keys match the VLGMaterialProperties attribute names.
+# Texture keys map to is_color_texture (True = sRGB, False = Non-Color data)
+_TEXTURE_KEYS = {
+    'basetexture': True,
+    'bumpmap': False,
+    'phongexponenttexture': False,
+    'envmapmask': False,
+    'selfillummask': False,
+    'lightwarptexture': False,
+    'detail': True,
+}
+_BOOL_KEYS = frozenset((
+    'phong', 'selfillum', 'translucent', 'alphatest', 'nocull', 'additive',
+    'rimlight', 'halflambert', 'phongalbedotint', 'blendtintbybasealpha',
+    'basealphaenvmapmask', 'normalmapalphaenvmapmask', 'basemapalphaphongmask',
+    'normalmapalphaphongmask', 'allowalphatocoverage',
+))
+_FLOAT_KEYS = frozenset((
+    'phongexponent', 'phongboost', 'rimlightexponent', 'rimlightboost',
+    'envmapfresnel', 'envmapcontrast', 'envmapsaturation', 'alphatestreference',
+))
+_VECTOR_KEYS = frozenset((
+    'envmaptint', 'phongtint', 'phongfresnelranges', 'selfillumtint', 'color', 'color2',
+))
+# Common spellings of VMT booleans, matched as-is before falling back to lower()
+_TRUE_VALUES = frozenset(('1', 'true', 'yes', 'True', 'TRUE', 'Yes', 'YES'))
+_FALSE_VALUES = frozenset(('0', 'false', 'no', 'False', 'FALSE', 'No', 'NO'))
+
+
+def _strip_proxies(vmt_content):
+    """Cut "Proxies" blocks out of VMT text, skipping each block with str.find()"""
+    match = _PROXIES_RE.search(vmt_content)
+    if not match:
+        return vmt_content
+    parts = []
+    start = 0
+    while match:
+        parts.append(vmt_content[start:match.start()])
+        # Walk to the matching close brace
+        pos = match.end()
+        depth = 1
+        while depth:
+            close_idx = vmt_content.find('}', pos)
+            if close_idx < 0:
+                pos = len(vmt_content)
+                break
+            open_idx = vmt_content.find('{', pos, close_idx)
+            if open_idx >= 0:
+                depth += 1
+                pos = open_idx + 1
+            else:
+                depth -= 1
+                pos = close_idx + 1
+        start = pos
+        match = _PROXIES_RE.search(vmt_content, start)
+    parts.append(vmt_content[start:])
+    return ''.join(parts)
+
+
+def _decode_vmt(data):
+    """Decode VMT bytes, trying the fast ASCII codec before lenient UTF-8"""
+    try:
+        return data.decode('ascii')
+    except UnicodeDecodeError:
+        return data.decode('utf-8', errors='ignore')
+
+
+def _tokenize_vmt(vmt_content):
+    """Split VMT text into (lowercased key, value) pairs, skipping proxies and comments"""
+    # Keys are interned so the key table lookups hash and compare by identity
+    return [(intern(key.lower()), value.strip()) for key, value in _KV_RE.findall(_strip_proxies(vmt_content))]
+
+
+def _parse_bool(value):
+    """Parse a VMT boolean ("1", "true", "yes")"""
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _parse_float(value):
+    """Parse a VMT float, returning None if the value is malformed"""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _parse_vector3(value):
+    """Parse a VMT "[r g b]" vector, returning None if the value is malformed"""
+    vec_match = _VEC_RE.match(value)
+    if not vec_match:
+        return None
+    try:
+        return (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
+    except ValueError:
+        return None
+
 # Compatibility wrapper for SourceIO logger
 class LoggerWrapper:
     """Wrapper to handle different SourceIO logger versions"""
@@ -38,30 +159,27 @@ class LoggerWrapper:
             print(f"[DEBUG] {msg}")
 
 
+# Per-texture and per-step import messages are only logged (and formatted) when
+# this is True. Follows the SourceIO logger's DEBUG level when it exposes one.
+_DEBUG = False
+
 # Check if SourceIO is available
 SOURCEIO_AVAILABLE = False
 try:
+    # Only what registration and material import need; the model importers are
+    # imported in VLG_OT_SourceIO_MDLImport.execute when an import actually runs
     from SourceIO.blender_bindings.operators.import_settings_base import ModelOptions
     from SourceIO.blender_bindings.operators.operator_helper import ImportOperatorHelper
-    from SourceIO.blender_bindings.shared.exceptions import RequiredFileNotFound
-    from SourceIO.blender_bindings.shared.model_container import ModelContainer
-    from SourceIO.blender_bindings.utils.resource_utils import serialize_mounted_content, deserialize_mounted_content
     from SourceIO.blender_bindings.utils.bpy_utils import get_or_create_material
     from SourceIO.library.shared.content_manager import ContentManager
-    from SourceIO.library.utils import FileBuffer
     from SourceIO.library.utils.tiny_path import TinyPath
-    from SourceIO.library.models.mdl.v49 import MdlV49
-    from SourceIO.library.models.vtx import open_vtx
-    from SourceIO.library.models.vvd import Vvd
-    from SourceIO.library.utils.path_utilities import find_vtx_cm
-    from SourceIO.blender_bindings.models.common import put_into_collections
-    from SourceIO.blender_bindings.models.mdl49.import_mdl import import_model as import_mdl49_model, import_animations
-    from SourceIO.blender_bindings.source1.phy import import_physics
-    from SourceIO.library.models.phy.phy import Phy
     from SourceIO.logger import SourceLogMan
     SOURCEIO_AVAILABLE = True
+    _MATERIALS = TinyPath("materials")
     _base_logger = SourceLogMan().get_logger("VLG::SourceIO")
     logger = LoggerWrapper(_base_logger)
+    if hasattr(_base_logger, 'isEnabledFor'):
+        _DEBUG = _base_logger.isEnabledFor(logging.DEBUG)
 except ImportError as e:
     print(f"[VLG] SourceIO not found - MDL import integration disabled: {e}")
     # Create a fallback logger that just prints
@@ -73,6 +191,292 @@ except ImportError as e:
     logger = FallbackLogger()
 
 
+# Texture file extensions probed by parse_vmt_with_cm, in priority order.
+# Loose raster files (e.g. TGAs converted with VTFEdit) win over the VTF.
+_TEXTURE_EXTENSIONS = ('.tga', '.png', '.jpg', '.jpeg', '.dds', '.bmp', '.vtf')
+# Lookup context (see _vmt_dir_hint_context) -> {lowercased material name: the search
+# path its VMT was found in}, i.e. where Source's search order resolved it last time.
+# The context covers the mounted content, the search path list and the loose
+# search path folders, so any change that could make an earlier search path
+# match switches to a fresh set of hints.
+_VMT_DIR_HINTS = {}
+# Most recently used lookup contexts kept in the hints file; older ones are stale
+_MAX_HINT_CONTEXTS = 32
+
+# _VMT_DIR_HINTS is persisted between Blender sessions as JSON
+_LOOKUP_HINTS_FILE = "vlg_lookup_hints.json"
+_lookup_hints_loaded = False
+# Set when a hint is added or changed, so the file is only rewritten then
+_lookup_hints_dirty = False
+
+
+def _lookup_hints_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES', path="vlg_cache", create=True), _LOOKUP_HINTS_FILE)
+
+
+def _load_lookup_hints():
+    """Merge the persisted lookup hints into the in-memory caches (once per session)"""
+    global _lookup_hints_loaded
+    if _lookup_hints_loaded:
+        return
+    _lookup_hints_loaded = True
+    try:
+        with open(_lookup_hints_path(), 'r', encoding='utf-8') as f:
+            contexts = json.load(f)["vmt_dirs"]
+        if not isinstance(contexts, dict):
+            raise ValueError("vmt_dirs is not a mapping")
+        for context, hints in contexts.items():
+            if not (isinstance(hints, dict)
+                    and all(isinstance(name, str) and isinstance(mat_path, str) for name, mat_path in hints.items())):
+                raise ValueError("bad hint entry")
+    except FileNotFoundError:
+        return
+    except Exception as e:
+        logger.warning(f"[VLG] Ignoring unreadable lookup hints: {e}")
+        return
+    for context, hints in contexts.items():
+        _VMT_DIR_HINTS.setdefault(context, hints)
+
+
+def _provider_paths(content_manager):
+    """Root folder or archive path of each content provider mounted in content_manager, in mount order"""
+    providers = getattr(content_manager, 'content_providers', None)
+    if providers is None:
+        providers = getattr(content_manager, 'children', None) or ()
+    if isinstance(providers, dict):
+        providers = providers.values()
+    paths = []
+    for provider in providers:
+        for attr in ('filepath', 'root', 'path'):
+            path = getattr(provider, attr, None)
+            if path is not None:
+                paths.append(str(path))
+                break
+    return paths
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _mounted_content_key(content_manager):
+    """Identify the content mounted in content_manager by each provider's path and mtime.
+    Every import creates a new ContentManager, so this is what stays the same
+    between imports until content is mounted, unmounted or changed on disk.
+    None if no provider path could be found."""
+    return tuple((path, _mtime_ns(path)) for path in _provider_paths(content_manager)) or None
+
+
+def _vmt_dir_hint_context(mount_key, materials_paths):
+    """Key for the search path hints valid for this mounted content (see
+    _mounted_content_key) and search path list. Adding a VMT to a loose search path
+    folder changes that folder's mtime, so a hint never hides a VMT added to an
+    earlier search path. None if the content is unknown."""
+    if mount_key is None:
+        return None
+    folder_stamps = [
+        _mtime_ns(os.path.join(root, 'materials', mat_path))
+        for root, _ in mount_key if os.path.isdir(root)
+        for mat_path in materials_paths
+    ]
+    return json.dumps([mount_key, list(materials_paths), folder_stamps])
+
+
+def _get_vmt_dir_hints(mount_key, materials_paths):
+    """Return the {name: search path} hints for this lookup context (created empty
+    if new), or None if hints can't be used"""
+    context = _vmt_dir_hint_context(mount_key, materials_paths)
+    if context is None:
+        return None
+    # Re-insert so the most recently used contexts are kept when saving
+    hints = _VMT_DIR_HINTS.pop(context, None)
+    if hints is None:
+        hints = {}
+    _VMT_DIR_HINTS[context] = hints
+    return hints
+
+
+def _set_vmt_dir_hint(hints, name, mat_path):
+    global _lookup_hints_dirty
+    if hints.get(name) != mat_path:
+        hints[name] = mat_path
+        _lookup_hints_dirty = True
+
+
+def _save_lookup_hints():
+    """Write the lookup hints if any changed since they were loaded or last saved"""
+    global _lookup_hints_dirty
+    if not _lookup_hints_dirty:
+        return
+    # Contexts whose content has since changed are never matched again; keep the recent ones
+    contexts = {context: hints for context, hints in list(_VMT_DIR_HINTS.items())[-_MAX_HINT_CONTEXTS:] if hints}
+    try:
+        with open(_lookup_hints_path(), 'w', encoding='utf-8') as f:
+            json.dump({"vmt_dirs": contexts}, f)
+    except Exception as e:
+        logger.warning(f"[VLG] Could not save lookup hints: {e}")
+        return
+    _lookup_hints_dirty = False
+
+
+def _find_file_cached(content_manager, path, file_cache):
+    """content_manager.find_file() memoized in file_cache, keyed by posix path.
+    Misses are cached too, so repeated probes for absent files are free.
+    path may be a TinyPath or a posix path string; a string is only turned
+    into a TinyPath when the lookup actually has to run."""
+    if file_cache is None:
+        return content_manager.find_file(TinyPath(path))
+    key = path if isinstance(path, str) else path.as_posix()
+    try:
+        file_obj = file_cache[key]
+    except KeyError:
+        file_obj = file_cache[key] = content_manager.find_file(TinyPath(path))
+    else:
+        # A cached buffer may already have been read - rewind it
+        if file_obj and hasattr(file_obj, 'seek'):
+            file_obj.seek(0)
+    return file_obj
+
+
+def _probe_file_path(file_obj):
+    """Get the actual filesystem path from a SourceIO file object by probing its attributes"""
+    if hasattr(file_obj, 'name') and isinstance(file_obj.name, str):
+        return file_obj.name
+    if hasattr(file_obj, 'filepath'):
+        return str(file_obj.filepath)
+    if hasattr(file_obj, 'path'):
+        return str(file_obj.path)
+    if hasattr(file_obj, '_path'):
+        return str(file_obj._path)
+    return None
+
+
+def _name_path(file_obj):
+    """Getter returning file_obj.name, probing again if an instance has no string name"""
+    name = getattr(file_obj, 'name', None)
+    return name if isinstance(name, str) else _probe_file_path(file_obj)
+
+
+def _attr_path_getter(attr):
+    """Getter returning str(file_obj.<attr>), probing again if an instance lacks it"""
+    def getter(file_obj):
+        try:
+            return str(getattr(file_obj, attr))
+        except AttributeError:
+            return _probe_file_path(file_obj)
+    return getter
+
+
+_ATTR_PATH_GETTERS = {attr: _attr_path_getter(attr) for attr in ('filepath', 'path', '_path')}
+
+# Path getter per SourceIO file object class, chosen by probing the first instance seen
+_PATH_GETTERS = {}
+
+
+def _pick_path_getter(file_obj):
+    """Run the attribute probing once and return the getter it settles on"""
+    if isinstance(getattr(file_obj, 'name', None), str):
+        return _name_path
+    for attr, getter in _ATTR_PATH_GETTERS.items():
+        if hasattr(file_obj, attr):
+            return getter
+    return _probe_file_path
+
+
+def get_file_path(file_obj):
+    """Get the actual filesystem path from a SourceIO file object.
+    File objects come from a handful of classes, so the attribute probing is
+    done once per class and the chosen getter reused."""
+    cls = type(file_obj)
+    getter = _PATH_GETTERS.get(cls)
+    if getter is None:
+        getter = _PATH_GETTERS[cls] = _pick_path_getter(file_obj)
+    return getter(file_obj)
+
+
+def _index_image(image_index, img):
+    """Add img to image_index under its lowercased name, with and without a file extension"""
+    name = img.name.lower()
+    image_index[name] = img
+    stem, dot, _ = name.rpartition('.')
+    if dot:
+        image_index.setdefault(stem, img)
+
+
+def _build_image_index():
+    """Map lowercased image names (with and without extension) to bpy.data.images"""
+    image_index = {}
+    for img in bpy.data.images:
+        _index_image(image_index, img)
+    return image_index
+
+
+def _find_material_roots(base_path):
+    """Return base_path and its ancestors (up to 10 levels) that contain a materials folder"""
+    roots = []
+    test_base = base_path
+    for _ in range(10):  # Max 10 levels up
+        if os.path.isdir(os.path.join(test_base, 'materials')):
+            roots.append(test_base)
+        parent = os.path.dirname(test_base)
+        if parent == test_base:
+            break
+        test_base = parent
+    return roots
+
+
+def _index_loose_vmts(roots, materials_paths):
+    """Map each search path to {lowercased loose VMT name: disk path}, from one directory
+    listing per root and search path. Roots earlier in the list win."""
+    index = {}
+    for mat_path in materials_paths:
+        names = index.setdefault(mat_path, {})
+        for root in roots:
+            folder = os.path.join(root, 'materials', mat_path)
+            try:
+                entries = os.listdir(folder)
+            except OSError:
+                continue
+            for entry in entries:
+                stem, ext = os.path.splitext(entry)
+                if ext.lower() == '.vmt':
+                    names.setdefault(stem.lower(), os.path.join(folder, entry))
+    return index
+
+
+# parse_vmt_with_cm results for the rest of the session, keyed by _vmt_cache_key()
+_parsed_vmt_cache = {}
+
+
+def _vmt_cache_key(mount_key, vmt_path, vmt_disk_path):
+    """Key loose VMTs by disk path and mtime so edits are picked up, others by relative path,
+    both scoped to the mounted content (see _mounted_content_key), since textures resolve
+    differently once other content is mounted. None if the mounted content is unknown."""
+    if mount_key is None:
+        return None
+    if vmt_disk_path:
+        try:
+            return (mount_key, vmt_disk_path, os.path.getmtime(vmt_disk_path))
+        except OSError:
+            pass
+    return (mount_key, vmt_path.as_posix(), None)
+
+
+def _get_parsed_vmt(key):
+    """Return cached VMT values for key, or None if not cached or one of its images was removed"""
+    values = _parsed_vmt_cache.get(key)
+    if values is None:
+        return None
+    for value in values.values():
+        if isinstance(value, str) and value.startswith("BLENDER_IMAGE:") and bpy.data.images.get(value[14:]) is None:
+            del _parsed_vmt_cache[key]
+            return None
+    return values
+
+
 def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, fix_wetness: bool = False):
     """
     Import materials using our VLG shader instead of SourceIO's.
@@ -101,6 +505,28 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
             return {}
     
     material_mapper = {}
+    # find_file results for this import (VMTs and texture probes)
+    file_cache = {}
+    # Existing Blender images by name, kept up to date as textures get loaded
+    image_index = _build_image_index()
+    # Game folders that can hold loose VMTs, searched once instead of per material
+    material_roots = _find_material_roots(base_path) if base_path else []
+    # Relative VMT paths known not to exist under any of material_roots
+    missing_vmt_paths = set()
+    
+    # Identifies the mounted content across imports, for the hints and the parsed VMT cache
+    mount_key = _mounted_content_key(content_manager)
+    # Loose folders mounted as content providers, in mount order
+    loose_roots = [root for root, _ in mount_key or () if os.path.isdir(root)]
+    # Search path -> loose VMTs in it. When every mounted provider is a loose folder
+    # the listing covers everything find_file can see, so it also rules out misses
+    loose_vmt_index = _index_loose_vmts(
+        loose_roots + [root for root in material_roots if root not in loose_roots], mdl.materials_paths)
+    loose_index_complete = bool(mount_key) and len(loose_roots) == len(mount_key)
+    
+    _load_lookup_hints()
+    # Search path hints recorded for exactly this mounted content and search path list
+    vmt_dir_hints = _get_vmt_dir_hints(mount_key, mdl.materials_paths)
     
     for material in mdl.materials:
         material_path = None
@@ -108,11 +534,27 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
         
         # Search through material paths to find the VMT
         vmt_disk_path = None  # Will store actual disk path if available
-        for mat_path in mdl.materials_paths:
-            vmt_path = TinyPath("materials") / mat_path / (material.name + ".vmt")
-            material_file = content_manager.find_file(vmt_path)
+        # Try the search path this material was found in last time first. Names in
+        # subfolders are left out, their folders aren't covered by the hint context
+        search_paths = mdl.materials_paths
+        name_lower = material.name.lower()
+        # Names in subfolders aren't in the loose index either
+        simple_name = '/' not in name_lower and '\\' not in name_lower
+        use_hints = vmt_dir_hints is not None and simple_name
+        hinted_path = vmt_dir_hints.get(name_lower) if use_hints else None
+        if hinted_path in search_paths:
+            search_paths = [hinted_path] + [p for p in search_paths if p != hinted_path]
+        for mat_path in search_paths:
+            # Search paths are still tried in order; the index only skips known misses
+            loose_vmt_path = loose_vmt_index[mat_path].get(name_lower) if simple_name else None
+            if loose_index_complete and simple_name and loose_vmt_path is None:
+                continue
+            vmt_path = _MATERIALS / mat_path / f"{material.name}.vmt"
+            material_file = _find_file_cached(content_manager, vmt_path, file_cache)
             if material_file:
                 material_path = TinyPath(mat_path) / material.name
+                if use_hints:
+                    _set_vmt_dir_hint(vmt_dir_hints, name_lower, mat_path)
                 
                 # Try multiple ways to get the actual disk path
                 # Method 1: Direct path attribute
@@ -136,25 +578,23 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
                     except:
                         pass
                 
-                # Method 4: Search common game paths for this VMT
-                if not vmt_disk_path:
-                    import os
+                # Method 4: Look the VMT up in the loose folders (mounted, or game
+                # folders above base_path); names in subfolders are probed for instead
+                if not vmt_disk_path and loose_vmt_path:
+                    vmt_disk_path = loose_vmt_path
+                if not vmt_disk_path and not simple_name:
                     vmt_relative = str(vmt_path)
-                    # Try base_path first (where MDL was loaded from)
-                    if base_path:
-                        # Go up to find garrysmod folder
-                        test_base = base_path
-                        for _ in range(10):  # Max 10 levels up
-                            test_path = os.path.join(test_base, vmt_relative)
+                    if vmt_relative not in missing_vmt_paths:
+                        for root in material_roots:
+                            test_path = os.path.join(root, vmt_relative)
                             if os.path.exists(test_path):
                                 vmt_disk_path = test_path
                                 break
-                            parent = os.path.dirname(test_base)
-                            if parent == test_base:
-                                break
-                            test_base = parent
+                        else:
+                            missing_vmt_paths.add(vmt_relative)
                 
-                logger.info(f"[VLG] Found VMT: {vmt_path}" + (f" (disk: {vmt_disk_path})" if vmt_disk_path else " (in VPK or path unknown)"))
+                if _DEBUG:
+                    logger.debug(f"[VLG] Found VMT: {vmt_path}" + (f" (disk: {vmt_disk_path})" if vmt_disk_path else " (in VPK or path unknown)"))
                 break
         
         if material_path is None:
@@ -176,14 +616,18 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
                 logger.info(f"[VLG] Skipping {mat.name} - already loaded with same settings")
                 continue
             else:
-                logger.info(f"[VLG] Rebuilding {mat.name} - fix_wetness changed from {cached_fix_wetness} to {fix_wetness}")
+                if _DEBUG:
+                    logger.debug(f"[VLG] Rebuilding {mat.name} - fix_wetness changed from {cached_fix_wetness} to {fix_wetness}")
         
-        # Read the VMT content
-        try:
-            vmt_content = material_file.read().decode('utf-8', errors='ignore')
-        except Exception as e:
-            logger.error(f"[VLG] Failed to read VMT for {material.name}: {e}")
-            continue
+        # VMTs parsed earlier in the session skip reading, parsing and texture resolution
+        vmt_key = _vmt_cache_key(mount_key, vmt_path, vmt_disk_path)
+        values = _get_parsed_vmt(vmt_key)
+        if values is None:
+            try:
+                vmt_pairs = _tokenize_vmt(_decode_vmt(material_file.read()))
+            except Exception as e:
+                logger.error(f"[VLG] Failed to read VMT for {material.name}: {e}")
+                continue
         
         # Ensure material has nodes
         mat.use_nodes = True
@@ -193,16 +637,28 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
         
         # Build base directory for texture resolution
         # The base_path is typically the directory containing the MDL
-        vmt_dir = str(TinyPath("materials") / material_path.parent)
+        vmt_dir = str(_MATERIALS / material_path.parent)
         
-        # Parse VMT with content manager for texture resolution
-        parse_vmt_with_cm(vmt_content, props, content_manager, vmt_dir, base_path)
+        if values is None:
+            # Parse VMT with content manager for texture resolution
+            unresolved = []
+            values = parse_vmt_with_cm(
+                vmt_pairs, props, content_manager, vmt_dir, base_path, file_cache, image_index, unresolved)
+            # Keep retrying textures that weren't found, they may be mounted later
+            if vmt_key is not None and not unresolved:
+                _parsed_vmt_cache[vmt_key] = values
+        else:
+            if _DEBUG:
+                logger.debug(f"[VLG] Reusing parsed VMT: {vmt_path}")
+            for key, value in values.items():
+                setattr(props, key, value)
         
         # Apply fix_wetness option from import dialog
         props.fix_wetness = fix_wetness
         
         # Debug: Log material properties before applying
-        logger.info(f"[VLG] Material {material.name}: translucent={props.translucent}, alphatest={props.alphatest}, fix_wetness={props.fix_wetness}")
+        if _DEBUG:
+            logger.debug(f"[VLG] Material {material.name}: translucent={props.translucent}, alphatest={props.alphatest}, fix_wetness={props.fix_wetness}")
         
         # Apply our VLG shader
         try:
@@ -214,33 +670,11 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
             
             # Ensure blend settings are correct for translucent/alphatest materials
             # Note: apply_vlg_material handles the blend mode based on $allowalphatocoverage
-            if props.translucent or props.alphatest:
-                logger.info(f"[VLG] Set blend_method for {material.name} (translucent={props.translucent})")
+            if _DEBUG and (props.translucent or props.alphatest):
+                logger.debug(f"[VLG] Set blend_method for {material.name} (translucent={props.translucent})")
             
-            # Apply correct color space and alpha settings for each texture type
-            if mat.node_tree:
-                for node in mat.node_tree.nodes:
-                    if node.type == 'TEX_IMAGE' and node.image:
-                        node_name_lower = node.name.lower()
-                        node_label_lower = node.label.lower() if node.label else ""
-                        
-                        # Base Texture: sRGB, Alpha Channel Packed
-                        if 'basetexture' in node_name_lower or 'base' in node_label_lower:
-                            node.image.colorspace_settings.name = 'sRGB'
-                            node.image.alpha_mode = 'CHANNEL_PACKED'
-                            logger.info(f"[VLG] Set {node.image.name} to sRGB, Alpha Channel Packed")
-                        
-                        # Normal Map: Non-Color, Alpha Channel Packed
-                        elif 'bumpmap' in node_name_lower or 'normal' in node_label_lower:
-                            node.image.colorspace_settings.name = 'Non-Color'
-                            node.image.alpha_mode = 'CHANNEL_PACKED'
-                            logger.info(f"[VLG] Set {node.image.name} to Non-Color, Alpha Channel Packed")
-                        
-                        # Phong Exponent Texture: Non-Color, Alpha Channel Packed
-                        elif 'phongexponent' in node_name_lower or 'exponent' in node_label_lower:
-                            node.image.colorspace_settings.name = 'Non-Color'
-                            node.image.alpha_mode = 'CHANNEL_PACKED'
-                            logger.info(f"[VLG] Set {node.image.name} to Non-Color, Alpha Channel Packed")
+            # Color space and alpha mode are set when each image is loaded
+            # (resolve_and_load_texture / load_texture), so no per-node fix-up is needed
             
             logger.info(f"[VLG] Applied VLG shader to: {material.name}")
         except Exception as e:
@@ -250,17 +684,22 @@ def import_materials_vlg(content_manager: ContentManager, mdl, base_path: str, f
     
     # Store material mapper on MDL for skingroups
     mdl.material_mapper = material_mapper
+    
+    _save_lookup_hints()
     return material_mapper
 
 
-def parse_vmt_with_cm(vmt_content: str, props, content_manager: ContentManager, vmt_dir: str, base_path: str):
+def parse_vmt_with_cm(vmt_content: str, props, content_manager: ContentManager, vmt_dir: str, base_path: str,
+                      file_cache: dict = None, image_index: dict = None, unresolved: list = None):
     """
     Parse VMT content and resolve textures using SourceIO's content manager.
     Converts texture paths to actual file paths that Blender can load.
+    vmt_content is VMT text, or (key, value) pairs already produced by _tokenize_vmt.
+    Returns the {property name: value} dict that was applied to props.
+    file_cache is an optional find_file cache shared across the materials of one import.
+    image_index is an optional name -> image index (see _build_image_index) shared the same way.
+    unresolved is an optional list that gets the texture paths that could not be found.
     """
-    import re
-    import os
-    
     # Import VTF loading from our module
     try:
         from . import vtf_parser
@@ -274,6 +713,59 @@ def parse_vmt_with_cm(vmt_content: str, props, content_manager: ContentManager,
     except ImportError:
         HAS_SOURCEIO_VTF = False
     
+    if image_index is None:
+        image_index = _build_image_index()
+    
+    def load_vtf_texture(texture_path: str, vtf_file, is_color_texture: bool):
+        """Return a loadable path or BLENDER_IMAGE marker for a found VTF, or None on failure"""
+        try:
+            # First check if it's a real file on disk
+            actual_path = get_file_path(vtf_file)
+            if actual_path and os.path.exists(actual_path):
+                if _DEBUG:
+                    logger.debug(f"[VLG] Found VTF: {actual_path}")
+                return actual_path
+            
+            # If it's in a VPK, use SourceIO's texture importer directly
+            if HAS_SOURCEIO_VTF:
+                try:
+                    # Use SourceIO's import_texture which handles VPK extraction properly
+                    image = sourceio_import_texture(TinyPath(texture_path), vtf_file)
+                    if image:
+                        image.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
+                        image.alpha_mode = 'CHANNEL_PACKED'
+                        _index_image(image_index, image)
+                        if _DEBUG:
+                            logger.debug(f"[VLG] Loaded VTF via SourceIO: {image.name}")
+                        return f"BLENDER_IMAGE:{image.name}"
+                except Exception as e:
+                    logger.error(f"[VLG] SourceIO texture import failed: {e}")
+            
+            # Fallback: use our VTF parser. In-memory buffers are parsed through a
+            # memoryview instead of copying them out with read()
+            try:
+                vtf_data = memoryview(vtf_file)
+            except TypeError:
+                if hasattr(vtf_file, 'seek'):
+                    vtf_file.seek(0)
+                vtf_data = vtf_file.read()
+            if vtf_data:
+                try:
+                    safe_name = texture_path.replace('/', '_').replace('\\', '_')
+                    image = vtf_parser.load_vtf_to_blender(vtf_data, safe_name)
+                    if image:
+                        image.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
+                        image.alpha_mode = 'CHANNEL_PACKED'
+                        _index_image(image_index, image)
+                        if _DEBUG:
+                            logger.debug(f"[VLG] Converted VTF: {image.name}")
+                        return f"BLENDER_IMAGE:{image.name}"
+                except Exception as e:
+                    logger.error(f"[VLG] Failed to convert VTF {texture_path}: {e}")
+        except Exception as e:
+            logger.error(f"[VLG] Error loading texture {texture_path}: {e}")
+        return None
+    
     def resolve_and_load_texture(texture_path: str, is_color_texture: bool = True) -> str:
         """Resolve a texture path and return a path Blender can load.
         
@@ -293,261 +785,80 @@ def parse_vmt_with_cm(vmt_content: str, props, content_manager: ContentManager,
         tex_name = texture_path.split('/')[-1]
         
         # First check if SourceIO already loaded this texture into Blender
-        for img in bpy.data.images:
-            img_name_lower = img.name.lower()
-            if tex_name.lower() in img_name_lower or texture_path.lower().replace('/', '_') in img_name_lower:
-                logger.info(f"[VLG] Found existing image: {img.name}")
-                # Set correct color space and alpha mode
-                img.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
-                img.alpha_mode = 'CHANNEL_PACKED'
-                # Return a special marker so we know to use this image directly
-                return f"BLENDER_IMAGE:{img.name}"
+        img = image_index.get(tex_name.lower()) or image_index.get(texture_path.lower().replace('/', '_'))
+        if img is not None:
+            if _DEBUG:
+                logger.debug(f"[VLG] Found existing image: {img.name}")
+            # Set correct color space and alpha mode
+            img.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
+            img.alpha_mode = 'CHANNEL_PACKED'
+            # Return a special marker so we know to use this image directly
+            return f"BLENDER_IMAGE:{img.name}"
         
-        # Try to find the file on disk
-        for ext in ['.tga', '.png', '.jpg', '.jpeg', '.dds', '.bmp']:
-            full_path = f"materials/{texture_path}{ext}"
-            tex_file = content_manager.find_file(TinyPath(full_path))
-            if tex_file:
+        # Probe the extensions in priority order; misses are memoized in file_cache
+        for ext in _TEXTURE_EXTENSIONS:
+            tex_file = _find_file_cached(content_manager, f"materials/{texture_path}{ext}", file_cache)
+            if not tex_file:
+                continue
+            if ext == '.vtf':
+                result = load_vtf_texture(texture_path, tex_file, is_color_texture)
+            else:
+                result = None
                 try:
                     actual_path = get_file_path(tex_file)
                     if actual_path and os.path.exists(actual_path):
-                        logger.info(f"[VLG] Found texture: {actual_path}")
-                        return actual_path
+                        if _DEBUG:
+                            logger.debug(f"[VLG] Found texture: {actual_path}")
+                        result = actual_path
                 except:
                     pass
-        
-        # Try VTF format
-        vtf_path = f"materials/{texture_path}.vtf"
-        vtf_file = content_manager.find_file(TinyPath(vtf_path))
-        if vtf_file:
-            try:
-                # First check if it's a real file on disk
-                actual_path = get_file_path(vtf_file)
-                if actual_path and os.path.exists(actual_path):
-                    logger.info(f"[VLG] Found VTF: {actual_path}")
-                    return actual_path
-                
-                # If it's in a VPK, use SourceIO's texture importer directly
-                if HAS_SOURCEIO_VTF:
-                    try:
-                        # Use SourceIO's import_texture which handles VPK extraction properly
-                        image = sourceio_import_texture(TinyPath(texture_path), vtf_file)
-                        if image:
-                            image.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
-                            image.alpha_mode = 'CHANNEL_PACKED'
-                            logger.info(f"[VLG] Loaded VTF via SourceIO: {image.name}")
-                            return f"BLENDER_IMAGE:{image.name}"
-                    except Exception as e:
-                        logger.error(f"[VLG] SourceIO texture import failed: {e}")
-                
-                # Fallback: use our VTF parser
-                vtf_data = vtf_file.read()
-                if vtf_data:
-                    try:
-                        from io import BytesIO
-                        safe_name = texture_path.replace('/', '_').replace('\\', '_')
-                        image = vtf_parser.load_vtf_to_blender(BytesIO(vtf_data), safe_name)
-                        if image:
-                            image.colorspace_settings.name = 'sRGB' if is_color_texture else 'Non-Color'
-                            image.alpha_mode = 'CHANNEL_PACKED'
-                            logger.info(f"[VLG] Converted VTF: {image.name}")
-                            return f"BLENDER_IMAGE:{image.name}"
-                    except Exception as e:
-                        logger.error(f"[VLG] Failed to convert VTF {texture_path}: {e}")
-            except Exception as e:
-                logger.error(f"[VLG] Error loading texture {texture_path}: {e}")
+            if result:
+                return result
         
         logger.warning(f"[VLG] Texture not found: {texture_path}")
+        if unresolved is not None:
+            unresolved.append(texture_path)
         return texture_path  # Return original path as fallback
     
-    def get_file_path(file_obj) -> str:
-        """Get the actual filesystem path from a SourceIO file object"""
-        if hasattr(file_obj, 'name') and isinstance(file_obj.name, str):
-            return file_obj.name
-        if hasattr(file_obj, 'filepath'):
-            return str(file_obj.filepath)
-        if hasattr(file_obj, 'path'):
-            return str(file_obj.path)
-        if hasattr(file_obj, '_path'):
-            return str(file_obj._path)
-        return None
+    if isinstance(vmt_content, str):
+        vmt_content = _tokenize_vmt(vmt_content)
     
-    # Parse the VMT line by line
-    lines = vmt_content.split('\n')
-    in_proxies = False
-    brace_depth = 0
+    # Property values collected from the VMT, applied to props at the end
+    values = {}
     
-    for line in lines:
-        line = line.strip()
-        
-        # Skip empty lines and comments
-        if not line or line.startswith('//'):
-            continue
-        
-        # Track brace depth for proxy sections
-        if '{' in line:
-            brace_depth += line.count('{')
-        if '}' in line:
-            brace_depth -= line.count('}')
-        
-        # Check for proxies section
-        if 'proxies' in line.lower():
-            in_proxies = True
-            continue
-        
-        # Skip proxy contents
-        if in_proxies and brace_depth > 1:
-            continue
-        if in_proxies and brace_depth <= 1:
-            in_proxies = False
-        
-        # Match key-value pairs: "$key" "value" or $key value
-        # Note: \s* allows zero or more whitespace (some VMTs have no space like "$key""value")
-        match = re.match(r'["\']?\$?(\w+)["\']?\s*["\']?([^"\']+)["\']?', line, re.IGNORECASE)
-        if not match:
-            continue
-        
-        key = match.group(1).lower()
-        value = match.group(2).strip()
-        
+    for key, value in vmt_content:
         # Handle texture paths (is_color_texture=True for sRGB, False for Non-Color data)
-        if key == 'basetexture':
-            props.basetexture = resolve_and_load_texture(value, is_color_texture=True)
-        elif key == 'bumpmap':
-            props.bumpmap = resolve_and_load_texture(value, is_color_texture=False)
-        elif key == 'phongexponenttexture':
-            props.phongexponenttexture = resolve_and_load_texture(value, is_color_texture=False)
+        if key in _TEXTURE_KEYS:
+            values[key] = resolve_and_load_texture(value, is_color_texture=_TEXTURE_KEYS[key])
         elif key == 'envmap':
             # Special envmap values
             if value.lower() in ('env_cubemap', 'environment maps/metal_generic_001'):
-                props.envmap = value
+                values['envmap'] = value
             else:
-                props.envmap = resolve_and_load_texture(value, is_color_texture=True)
-        elif key == 'envmapmask':
-            props.envmapmask = resolve_and_load_texture(value, is_color_texture=False)
-        elif key == 'selfillummask':
-            props.selfillummask = resolve_and_load_texture(value, is_color_texture=False)
-        elif key == 'lightwarptexture':
-            props.lightwarptexture = resolve_and_load_texture(value, is_color_texture=False)
-        elif key == 'detail':
-            props.detail = resolve_and_load_texture(value, is_color_texture=True)
+                values['envmap'] = resolve_and_load_texture(value, is_color_texture=True)
         
         # Handle boolean properties
-        elif key == 'phong':
-            props.phong = value.lower() in ('1', 'true', 'yes')
-        elif key == 'selfillum':
-            props.selfillum = value.lower() in ('1', 'true', 'yes')
-        elif key == 'translucent':
-            props.translucent = value.lower() in ('1', 'true', 'yes')
-            logger.info(f"[VLG] Parsed $translucent = {value} -> {props.translucent}")
-        elif key == 'alphatest':
-            props.alphatest = value.lower() in ('1', 'true', 'yes')
-        elif key == 'nocull':
-            props.nocull = value.lower() in ('1', 'true', 'yes')
-        elif key == 'additive':
-            props.additive = value.lower() in ('1', 'true', 'yes')
-        elif key == 'rimlight':
-            props.rimlight = value.lower() in ('1', 'true', 'yes')
-        elif key == 'halflambert':
-            props.halflambert = value.lower() in ('1', 'true', 'yes')
-        elif key == 'phongalbedotint':
-            props.phongalbedotint = value.lower() in ('1', 'true', 'yes')
-        elif key == 'blendtintbybasealpha':
-            props.blendtintbybasealpha = value.lower() in ('1', 'true', 'yes')
-        elif key == 'basealphaenvmapmask':
-            props.basealphaenvmapmask = value.lower() in ('1', 'true', 'yes')
-        elif key == 'normalmapalphaenvmapmask':
-            props.normalmapalphaenvmapmask = value.lower() in ('1', 'true', 'yes')
-        elif key == 'basemapalphaphongmask':
-            props.basemapalphaphongmask = value.lower() in ('1', 'true', 'yes')
-        elif key == 'normalmapalphaphongmask':
-            props.normalmapalphaphongmask = value.lower() in ('1', 'true', 'yes')
+        elif key in _BOOL_KEYS:
+            values[key] = _parse_bool(value)
+            if key == 'translucent':
+                if _DEBUG:
+                    logger.debug(f"[VLG] Parsed $translucent = {value} -> {values['translucent']}")
         
         # Handle numeric properties
-        elif key == 'phongexponent':
-            try:
-                props.phongexponent = float(value)
-            except ValueError:
-                pass
-        elif key == 'phongboost':
-            try:
-                props.phongboost = float(value)
-            except ValueError:
-                pass
-        elif key == 'rimlightexponent':
-            try:
-                props.rimlightexponent = float(value)
-            except ValueError:
-                pass
-        elif key == 'rimlightboost':
-            try:
-                props.rimlightboost = float(value)
-            except ValueError:
-                pass
-        elif key == 'envmapfresnel':
-            try:
-                props.envmapfresnel = float(value)
-            except ValueError:
-                pass
-        elif key == 'envmapcontrast':
-            try:
-                props.envmapcontrast = float(value)
-            except ValueError:
-                pass
-        elif key == 'envmapsaturation':
-            try:
-                props.envmapsaturation = float(value)
-            except ValueError:
-                pass
-        elif key == 'alphatestreference':
-            try:
-                props.alphatestreference = float(value)
-            except ValueError:
-                pass
-        elif key == 'allowalphatocoverage':
-            props.allowalphatocoverage = value.lower() in ('1', 'true', 'yes')
+        elif key in _FLOAT_KEYS:
+            number = _parse_float(value)
+            if number is not None:
+                values[key] = number
         
         # Handle color/vector properties
-        elif key == 'envmaptint':
-            try:
-                # Parse "[r g b]" format
-                vec_match = re.match(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?', value)
-                if vec_match:
-                    props.envmaptint = (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
-            except:
-                pass
-        elif key == 'phongtint':
-            try:
-                vec_match = re.match(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?', value)
-                if vec_match:
-                    props.phongtint = (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
-            except:
-                pass
-        elif key == 'phongfresnelranges':
-            try:
-                vec_match = re.match(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?', value)
-                if vec_match:
-                    props.phongfresnelranges = (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
-            except:
-                pass
-        elif key == 'selfillumtint':
-            try:
-                vec_match = re.match(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?', value)
-                if vec_match:
-                    props.selfillumtint = (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
-            except:
-                pass
-        elif key == 'color' or key == 'color2':
-            try:
-                vec_match = re.match(r'\[?\s*([\d.]+)\s+([\d.]+)\s+([\d.]+)\s*\]?', value)
-                if vec_match:
-                    color_val = (float(vec_match.group(1)), float(vec_match.group(2)), float(vec_match.group(3)))
-                    if key == 'color':
-                        props.color = color_val
-                    else:
-                        props.color2 = color_val
-            except:
-                pass
+        elif key in _VECTOR_KEYS:
+            vector = _parse_vector3(value)
+            if vector is not None:
+                values[key] = vector
+    
+    for key, value in values.items():
+        setattr(props, key, value)
+    return values
 
 
 if SOURCEIO_AVAILABLE:
@@ -567,6 +878,25 @@ if SOURCEIO_AVAILABLE:
         filter_glob: StringProperty(default="*.mdl;*.md3", options={'HIDDEN'})
 
         def execute(self, context):
+            # A SourceIO version without one of these used to disable the integration
+            # at load time; now that they load lazily, report it instead of raising
+            try:
+                from SourceIO.blender_bindings.shared.exceptions import RequiredFileNotFound
+                from SourceIO.blender_bindings.utils.resource_utils import serialize_mounted_content, deserialize_mounted_content
+                from SourceIO.library.utils import FileBuffer
+                from SourceIO.library.models.mdl.v49 import MdlV49
+                from SourceIO.library.models.vtx import open_vtx
+                from SourceIO.library.models.vvd import Vvd
+                from SourceIO.library.utils.path_utilities import find_vtx_cm
+                from SourceIO.blender_bindings.models.common import put_into_collections
+                from SourceIO.blender_bindings.models.mdl49.import_mdl import import_model as import_mdl49_model, import_animations
+                from SourceIO.blender_bindings.source1.phy import import_physics
+                from SourceIO.library.models.phy.phy import Phy
+            except ImportError as e:
+                logger.error(f"[VLG] SourceIO MDL import is unavailable: {e}")
+                self.report({'ERROR'}, f"This SourceIO version is not supported for MDL import: {e}")
+                return {'CANCELLED'}
+            
             directory = self.get_directory()
             base_path = str(directory)
 
@@ -585,9 +915,11 @@ if SOURCEIO_AVAILABLE:
                         # Load MDL file
                         mdl = MdlV49.from_buffer(f)
                         
-                        # Find VTX and VVD files
-                        vtx_buffer = find_vtx_cm(mdl_path, content_manager)
-                        vvd_buffer = content_manager.find_file(mdl_path.with_suffix(".vvd"))
+                        # Find VVD and VTX files. The VTX search probes several suffixes,
+                        # so skip it when the VVD is already missing
+                        vvd_path = mdl_path.with_suffix(".vvd")
+                        vvd_buffer = content_manager.find_file(vvd_path)
+                        vtx_buffer = find_vtx_cm(mdl_path, content_manager) if vvd_buffer is not None else None
                         
                         if vtx_buffer is None or vvd_buffer is None:
                             self.report({"ERROR"}, f"Could not find VTX and/or VVD file for {mdl_path}")
@@ -606,7 +938,8 @@ if SOURCEIO_AVAILABLE:
                         
                         # Import physics if requested
                         if self.import_physics:
-                            phy_buffer = content_manager.find_file(mdl_path.with_suffix(".phy"))
+                            phy_path = mdl_path.with_suffix(".phy")
+                            phy_buffer = content_manager.find_file(phy_path)
                             if phy_buffer:
                                 phy = Phy.from_buffer(phy_buffer)
                                 import_physics(phy, phy_buffer, mdl, container, self.scale)
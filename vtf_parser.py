@@ -1,11 +1,24 @@
 # VTF (Valve Texture Format) Parser for Python/Blender
 # Based on Source Engine VTF specification
 
+import ctypes
+import mmap
 import struct
+import sys
 from enum import IntEnum
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 import os
 
+import numpy as np
+
+# Optional: Numba compiles the scalar DXT5 kernel to native code
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 class VtfImageFormat(IntEnum):
     """VTF image format enum"""
@@ -39,6 +52,44 @@ class VtfImageFormat(IntEnum):
     UVLX8888 = 26
 
 
+# Bytes per pixel of the uncompressed formats
+_BPP = {
+    VtfImageFormat.RGBA8888: 4,
+    VtfImageFormat.ABGR8888: 4,
+    VtfImageFormat.RGB888: 3,
+    VtfImageFormat.BGR888: 3,
+    VtfImageFormat.RGB565: 2,
+    VtfImageFormat.I8: 1,
+    VtfImageFormat.IA88: 2,
+    VtfImageFormat.P8: 1,
+    VtfImageFormat.A8: 1,
+    VtfImageFormat.ARGB8888: 4,
+    VtfImageFormat.BGRA8888: 4,
+    VtfImageFormat.BGRX8888: 4,
+    VtfImageFormat.BGR565: 2,
+    VtfImageFormat.BGRX5551: 2,
+    VtfImageFormat.BGRA4444: 2,
+    VtfImageFormat.BGRA5551: 2,
+    VtfImageFormat.UV88: 2,
+    VtfImageFormat.UVWQ8888: 4,
+    VtfImageFormat.RGBA16161616F: 8,
+    VtfImageFormat.RGBA16161616: 8,
+    VtfImageFormat.UVLX8888: 4,
+}
+
+# Bytes per 4x4 block of the block-compressed formats
+_BLOCK_BYTES = {
+    VtfImageFormat.DXT1: 8,
+    VtfImageFormat.DXT1_ONEBITALPHA: 8,
+    VtfImageFormat.DXT3: 16,
+    VtfImageFormat.DXT5: 16,
+}
+
+# VTF 7.2 header: signature, version, header size, dimensions, flags, frames,
+# reflectivity, bump scale, formats, mip count, thumbnail size and depth
+_VTF_HEADER = struct.Struct('<IIII HH I HH 4x fff 4x f i B i BB H')
+
+
 class VtfFile:
     """VTF file parser and converter"""
     
@@ -65,16 +116,55 @@ class VtfFile:
         self.depth = 1
         self.num_resources = 0
         
-        self.mip_data = []
         self.thumbnail_data = None
+        self.mip_dims = []  # (width, height) of each mip, largest first
+        
+        # File data and (offset, frame size, frame count) of each mip, sliced on demand
+        self._raw = None
+        self._mip_offsets = []
+        # File mapping opened by load(), released by close()
+        self._mmap = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Release the file data. Mip views handed out earlier must not be used
+        afterwards; a mapping they still hold is closed once they are gone."""
+        for view in (self._raw, self.thumbnail_data):
+            if view is not None:
+                view.release()
+        self._raw = None
+        self.thumbnail_data = None
+        self._mip_offsets = []
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Still exported through a caller's view: drop our reference instead
+                pass
+            self._mmap = None
     
     @staticmethod
     def load(filepath: str) -> Optional['VtfFile']:
-        """Load a VTF file from disk"""
+        """Load a VTF file from disk. The file stays mapped until close() is called."""
         try:
+            # Map the file instead of reading it: mips are sliced straight from the mapping
             with open(filepath, 'rb') as f:
-                data = f.read()
-            return VtfFile.parse(data)
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                vtf = VtfFile.parse(data)
+            except Exception:
+                data.close()
+                raise
+            if vtf is None:
+                data.close()
+                return None
+            vtf._mmap = data
+            return vtf
         except Exception as e:
             print(f"[VTF] Failed to load {filepath}: {e}")
             return None
@@ -87,35 +177,40 @@ class VtfFile:
             return None
         
         vtf = VtfFile()
+        # Mip and thumbnail slices are zero-copy views into the file data
+        view = memoryview(data)
         
-        # Read header (64 bytes minimum for 7.2)
-        vtf.signature = struct.unpack_from('<I', data, 0)[0]
+        # Read header (65 bytes through the 7.2 depth field)
+        (signature, version_major, version_minor, header_size,
+         width, height, flags, frames, first_frame,
+         refl_r, refl_g, refl_b, bump_scale,
+         high_res_format, mip_count, low_res_format,
+         low_res_width, low_res_height, depth) = _VTF_HEADER.unpack_from(data, 0)
         
+        vtf.signature = signature
         if vtf.signature != VtfFile.VTF_SIGNATURE:
             print(f"[VTF] Invalid signature: 0x{vtf.signature:08X}")
             return None
         
-        vtf.version_major = struct.unpack_from('<I', data, 4)[0]
-        vtf.version_minor = struct.unpack_from('<I', data, 8)[0]
-        vtf.header_size = struct.unpack_from('<I', data, 12)[0]
-        vtf.width = struct.unpack_from('<H', data, 16)[0]
-        vtf.height = struct.unpack_from('<H', data, 18)[0]
-        vtf.flags = struct.unpack_from('<I', data, 20)[0]
-        vtf.frames = struct.unpack_from('<H', data, 24)[0]
-        vtf.first_frame = struct.unpack_from('<H', data, 26)[0]
-        # padding 4 bytes at 28
-        vtf.reflectivity = struct.unpack_from('<fff', data, 32)
-        # padding 4 bytes at 44
-        vtf.bump_scale = struct.unpack_from('<f', data, 48)[0]
-        vtf.high_res_format = VtfImageFormat(struct.unpack_from('<i', data, 52)[0])
-        vtf.mip_count = struct.unpack_from('<B', data, 56)[0]
-        vtf.low_res_format = VtfImageFormat(struct.unpack_from('<i', data, 57)[0])
-        vtf.low_res_width = struct.unpack_from('<B', data, 61)[0]
-        vtf.low_res_height = struct.unpack_from('<B', data, 62)[0]
+        vtf.version_major = version_major
+        vtf.version_minor = version_minor
+        vtf.header_size = header_size
+        vtf.width = width
+        vtf.height = height
+        vtf.flags = flags
+        vtf.frames = frames
+        vtf.first_frame = first_frame
+        vtf.reflectivity = (refl_r, refl_g, refl_b)
+        vtf.bump_scale = bump_scale
+        vtf.high_res_format = VtfImageFormat(high_res_format)
+        vtf.mip_count = mip_count
+        vtf.low_res_format = VtfImageFormat(low_res_format)
+        vtf.low_res_width = low_res_width
+        vtf.low_res_height = low_res_height
         
         # Version 7.2+ has depth
         if vtf.version_major >= 7 and vtf.version_minor >= 2:
-            vtf.depth = struct.unpack_from('<H', data, 63)[0]
+            vtf.depth = depth
         
         print(f"[VTF] Loaded: {vtf.width}x{vtf.height}, format={vtf.high_res_format.name}, mips={vtf.mip_count}")
         
@@ -125,74 +220,72 @@ class VtfFile:
         # Read low-res thumbnail if present
         if vtf.low_res_format != VtfImageFormat.NONE and vtf.low_res_width > 0 and vtf.low_res_height > 0:
             thumb_size = VtfFile.calculate_image_size(vtf.low_res_format, vtf.low_res_width, vtf.low_res_height)
-            vtf.thumbnail_data = data[data_offset:data_offset + thumb_size]
+            vtf.thumbnail_data = view[data_offset:data_offset + thumb_size]
             data_offset += thumb_size
         
-        # Read mip levels (stored smallest to largest, from end of file)
-        vtf.mip_data = [None] * vtf.mip_count
+        # Locate mip levels (stored smallest to largest, from end of file)
+        vtf._raw = view
+        vtf._mip_offsets = [None] * vtf.mip_count
         current_offset = len(data)
         
         frame_count = max(1, vtf.frames)
         
-        for mip in range(vtf.mip_count):
-            mip_width = max(1, vtf.width >> mip)
-            mip_height = max(1, vtf.height >> mip)
-            mip_size = VtfFile.calculate_image_size(vtf.high_res_format, mip_width, mip_height)
-            mip_size *= frame_count  # Multiply by frame count for animated textures
+        # Size each mip inline (same formula as calculate_image_size)
+        block_bytes = _BLOCK_BYTES.get(vtf.high_res_format)
+        pixel_bytes = _BPP.get(vtf.high_res_format, 4)
+        
+        vtf.mip_dims = [(max(1, vtf.width >> mip), max(1, vtf.height >> mip)) for mip in range(vtf.mip_count)]
+        
+        for mip, (mip_width, mip_height) in enumerate(vtf.mip_dims):
+            if block_bytes is not None:
+                frame_size = ((max(4, mip_width) + 3) // 4) * ((max(4, mip_height) + 3) // 4) * block_bytes
+            else:
+                frame_size = mip_width * mip_height * pixel_bytes
             
-            current_offset -= mip_size
+            # Frames of a mip are stored back to back
+            current_offset -= frame_size * frame_count
             if current_offset >= 0:
-                vtf.mip_data[mip] = data[current_offset:current_offset + mip_size]
+                vtf._mip_offsets[mip] = (current_offset, frame_size, frame_count)
         
         return vtf
     
     @staticmethod
     def calculate_image_size(format: VtfImageFormat, width: int, height: int) -> int:
         """Calculate the size in bytes for an image in a given format"""
-        # Ensure minimum dimensions for block-compressed formats
-        if format in (VtfImageFormat.DXT1, VtfImageFormat.DXT1_ONEBITALPHA,
-                      VtfImageFormat.DXT3, VtfImageFormat.DXT5):
-            width = max(4, width)
-            height = max(4, height)
-        
-        size_map = {
-            VtfImageFormat.RGBA8888: width * height * 4,
-            VtfImageFormat.ABGR8888: width * height * 4,
-            VtfImageFormat.RGB888: width * height * 3,
-            VtfImageFormat.BGR888: width * height * 3,
-            VtfImageFormat.RGB565: width * height * 2,
-            VtfImageFormat.I8: width * height,
-            VtfImageFormat.IA88: width * height * 2,
-            VtfImageFormat.P8: width * height,
-            VtfImageFormat.A8: width * height,
-            VtfImageFormat.ARGB8888: width * height * 4,
-            VtfImageFormat.BGRA8888: width * height * 4,
-            VtfImageFormat.DXT1: ((width + 3) // 4) * ((height + 3) // 4) * 8,
-            VtfImageFormat.DXT1_ONEBITALPHA: ((width + 3) // 4) * ((height + 3) // 4) * 8,
-            VtfImageFormat.DXT3: ((width + 3) // 4) * ((height + 3) // 4) * 16,
-            VtfImageFormat.DXT5: ((width + 3) // 4) * ((height + 3) // 4) * 16,
-            VtfImageFormat.BGRX8888: width * height * 4,
-            VtfImageFormat.BGR565: width * height * 2,
-            VtfImageFormat.BGRX5551: width * height * 2,
-            VtfImageFormat.BGRA4444: width * height * 2,
-            VtfImageFormat.BGRA5551: width * height * 2,
-            VtfImageFormat.UV88: width * height * 2,
-            VtfImageFormat.UVWQ8888: width * height * 4,
-            VtfImageFormat.RGBA16161616F: width * height * 8,
-            VtfImageFormat.RGBA16161616: width * height * 8,
-            VtfImageFormat.UVLX8888: width * height * 4,
-        }
-        
-        return size_map.get(format, width * height * 4)
-    
-    def get_largest_mip_data(self) -> Optional[bytes]:
-        """Get the largest mip level data (highest resolution)"""
-        if not self.mip_data or len(self.mip_data) == 0:
+        block_bytes = _BLOCK_BYTES.get(format)
+        if block_bytes is not None:
+            # Block-compressed formats store at least one 4x4 block
+            return ((max(4, width) + 3) // 4) * ((max(4, height) + 3) // 4) * block_bytes
+        return width * height * _BPP.get(format, 4)
+    
+    def get_mip(self, index: int) -> Optional[memoryview]:
+        """Get the data of a mip level (0 = largest), all frames, as a zero-copy view, or None if it is missing"""
+        if index >= len(self._mip_offsets) or self._mip_offsets[index] is None:
             return None
-        return self.mip_data[0]
+        offset, frame_size, frame_count = self._mip_offsets[index]
+        return self._raw[offset:offset + frame_size * frame_count]
     
-    def convert_to_rgba(self, force_opaque_alpha: bool = False) -> Optional[bytes]:
-        """Convert to RGBA8888 format"""
+    def get_mip_frame(self, index: int, frame: int = 0) -> Optional[memoryview]:
+        """Get one frame of a mip level as a zero-copy view, or None if it is missing"""
+        if index >= len(self._mip_offsets) or self._mip_offsets[index] is None:
+            return None
+        offset, frame_size, frame_count = self._mip_offsets[index]
+        if not 0 <= frame < frame_count:
+            return None
+        offset += frame * frame_size
+        return self._raw[offset:offset + frame_size]
+    
+    @property
+    def mip_data(self) -> list:
+        """Data of every mip level, largest first"""
+        return [self.get_mip(mip) for mip in range(len(self._mip_offsets))]
+    
+    def get_largest_mip_data(self) -> Optional[memoryview]:
+        """Get the largest mip level data (highest resolution, first frame)"""
+        return self.get_mip_frame(0)
+    
+    def convert_to_rgba(self, force_opaque_alpha: bool = False) -> Optional[Union[bytearray, memoryview]]:
+        """Convert to RGBA8888 format (a bytes-like buffer, not necessarily bytes)"""
         data = self.get_largest_mip_data()
         if data is None:
             return None
@@ -201,46 +294,46 @@ class VtfFile:
         
         # Force alpha to 255 if requested
         if force_opaque_alpha and rgba:
-            rgba = bytearray(rgba)
-            for i in range(3, len(rgba), 4):
-                rgba[i] = 255
-            rgba = bytes(rgba)
+            # Views into the file data are copied before writing; converted buffers are ours
+            if not isinstance(rgba, bytearray):
+                rgba = bytearray(rgba)
+            np.frombuffer(rgba, dtype=np.uint8)[3::4] = 255
         
         return rgba
     
-    def _convert_format_to_rgba(self, data: bytes, width: int, height: int, format: VtfImageFormat) -> bytes:
+    def _convert_format_to_rgba(self, data: bytes, width: int, height: int,
+                                format: VtfImageFormat) -> Union[bytearray, memoryview]:
         """Convert image data to RGBA8888 format"""
-        rgba = bytearray(width * height * 4)
+        size = width * height * 4
+        if format == VtfImageFormat.RGBA8888 and len(data) >= size:
+            # Already RGBA: hand back the mip itself (a view when parsed from a buffer)
+            return data[:size]
+        
+        rgba = bytearray(size)
+        # (pixels, 4) view of rgba for the vectorized conversions
+        out = np.frombuffer(rgba, dtype=np.uint8).reshape(-1, 4)
         
         if format == VtfImageFormat.RGBA8888:
-            rgba[:min(len(data), len(rgba))] = data[:min(len(data), len(rgba))]
+            # Truncated data: copy what there is, the rest stays zero
+            rgba[:len(data)] = data
         
         elif format == VtfImageFormat.BGRA8888:
-            for i in range(width * height):
-                if i * 4 + 3 >= len(data):
-                    break
-                rgba[i * 4 + 0] = data[i * 4 + 2]  # R
-                rgba[i * 4 + 1] = data[i * 4 + 1]  # G
-                rgba[i * 4 + 2] = data[i * 4 + 0]  # B
-                rgba[i * 4 + 3] = data[i * 4 + 3]  # A
+            # Pixels missing from truncated data stay zero
+            pixel_count = min(width * height, len(data) // 4)
+            src = np.frombuffer(data, dtype=np.uint8, count=pixel_count * 4).reshape(-1, 4)
+            out[:pixel_count] = src[:, [2, 1, 0, 3]]
         
         elif format == VtfImageFormat.RGB888:
-            for i in range(width * height):
-                if i * 3 + 2 >= len(data):
-                    break
-                rgba[i * 4 + 0] = data[i * 3 + 0]  # R
-                rgba[i * 4 + 1] = data[i * 3 + 1]  # G
-                rgba[i * 4 + 2] = data[i * 3 + 2]  # B
-                rgba[i * 4 + 3] = 255              # A
+            pixel_count = min(width * height, len(data) // 3)
+            src = np.frombuffer(data, dtype=np.uint8, count=pixel_count * 3).reshape(-1, 3)
+            out[:pixel_count, :3] = src
+            out[:pixel_count, 3] = 255
         
         elif format == VtfImageFormat.BGR888:
-            for i in range(width * height):
-                if i * 3 + 2 >= len(data):
-                    break
-                rgba[i * 4 + 0] = data[i * 3 + 2]  # R
-                rgba[i * 4 + 1] = data[i * 3 + 1]  # G
-                rgba[i * 4 + 2] = data[i * 3 + 0]  # B
-                rgba[i * 4 + 3] = 255              # A
+            pixel_count = min(width * height, len(data) // 3)
+            src = np.frombuffer(data, dtype=np.uint8, count=pixel_count * 3).reshape(-1, 3)
+            out[:pixel_count, :3] = src[:, ::-1]
+            out[:pixel_count, 3] = 255
         
         elif format in (VtfImageFormat.DXT1, VtfImageFormat.DXT1_ONEBITALPHA):
             self._decompress_dxt1(data, rgba, width, height)
@@ -270,13 +363,9 @@ class VtfFile:
                 rgba[i * 4 + 3] = data[i]
         
         elif format == VtfImageFormat.ARGB8888:
-            for i in range(width * height):
-                if i * 4 + 3 >= len(data):
-                    break
-                rgba[i * 4 + 0] = data[i * 4 + 1]  # R
-                rgba[i * 4 + 1] = data[i * 4 + 2]  # G
-                rgba[i * 4 + 2] = data[i * 4 + 3]  # B
-                rgba[i * 4 + 3] = data[i * 4 + 0]  # A
+            pixel_count = min(width * height, len(data) // 4)
+            src = np.frombuffer(data, dtype=np.uint8, count=pixel_count * 4).reshape(-1, 4)
+            out[:pixel_count] = src[:, [1, 2, 3, 0]]
         
         else:
             print(f"[VTF] Unsupported format: {format.name}, filling with gray")
@@ -286,213 +375,299 @@ class VtfFile:
                 rgba[i + 2] = 128
                 rgba[i + 3] = 255
         
-        return bytes(rgba)
+        return rgba
     
     @staticmethod
     def _decode_rgb565(color: int) -> Tuple[int, int, int]:
         """Decode RGB565 color to RGB components"""
-        r = ((color >> 11) & 0x1F) * 255 // 31
-        g = ((color >> 5) & 0x3F) * 255 // 63
-        b = (color & 0x1F) * 255 // 31
-        return r, g, b
+        return int(_R5[color]), int(_G6[color]), int(_B5[color])
     
     def _decompress_dxt1(self, compressed: bytes, output: bytearray, width: int, height: int):
         """Decompress DXT1 block-compressed data"""
-        block_width = (width + 3) // 4
-        block_height = (height + 3) // 4
-        block_index = 0
+        if _decompress_dxt_native('dxt1_decode', compressed, output, width, height):
+            return
         
-        for by in range(block_height):
-            for bx in range(block_width):
-                block_offset = block_index * 8
-                if block_offset + 8 > len(compressed):
-                    break
-                
-                # Read color endpoints
-                c0 = compressed[block_offset] | (compressed[block_offset + 1] << 8)
-                c1 = compressed[block_offset + 2] | (compressed[block_offset + 3] << 8)
-                
-                # Decode colors
-                colors = [0] * 16
-                r0, g0, b0 = self._decode_rgb565(c0)
-                r1, g1, b1 = self._decode_rgb565(c1)
-                
-                colors[0:4] = [r0, g0, b0, 255]
-                colors[4:8] = [r1, g1, b1, 255]
-                
-                if c0 > c1:
-                    colors[8:12] = [
-                        (2 * r0 + r1) // 3,
-                        (2 * g0 + g1) // 3,
-                        (2 * b0 + b1) // 3,
-                        255
-                    ]
-                    colors[12:16] = [
-                        (r0 + 2 * r1) // 3,
-                        (g0 + 2 * g1) // 3,
-                        (b0 + 2 * b1) // 3,
-                        255
-                    ]
-                else:
-                    colors[8:12] = [
-                        (r0 + r1) // 2,
-                        (g0 + g1) // 2,
-                        (b0 + b1) // 2,
-                        255
-                    ]
-                    colors[12:16] = [0, 0, 0, 0]  # Transparent
-                
-                # Read indices
-                indices = (compressed[block_offset + 4] |
-                          (compressed[block_offset + 5] << 8) |
-                          (compressed[block_offset + 6] << 16) |
-                          (compressed[block_offset + 7] << 24))
-                
-                # Write pixels
-                for py in range(4):
-                    for px in range(4):
-                        x = bx * 4 + px
-                        y = by * 4 + py
-                        if x >= width or y >= height:
-                            continue
-                        
-                        color_index = (indices >> ((py * 4 + px) * 2)) & 0x3
-                        out_offset = (y * width + x) * 4
-                        output[out_offset:out_offset + 4] = bytes(colors[color_index * 4:(color_index + 1) * 4])
-                
-                block_index += 1
+        blocks = _dxt_blocks(compressed, width, height, 8)
+        if blocks is None:
+            return
+        
+        # c0 <= c1 selects 3-color mode, where index 3 is transparent black
+        texels = _dxt_color_texels(blocks, four_color_only=False)
+        _store_dxt_blocks(output, texels, width, height)
     
     def _decompress_dxt3(self, compressed: bytes, output: bytearray, width: int, height: int):
         """Decompress DXT3 block-compressed data"""
-        block_width = (width + 3) // 4
-        block_height = (height + 3) // 4
-        block_index = 0
+        if _decompress_dxt_native('dxt3_decode', compressed, output, width, height):
+            return
         
-        for by in range(block_height):
-            for bx in range(block_width):
-                block_offset = block_index * 16
-                if block_offset + 16 > len(compressed):
-                    break
-                
-                # Read alpha values (first 8 bytes)
-                alphas = 0
-                for i in range(8):
-                    alphas |= compressed[block_offset + i] << (i * 8)
-                
-                # Read color data
-                c0 = compressed[block_offset + 8] | (compressed[block_offset + 9] << 8)
-                c1 = compressed[block_offset + 10] | (compressed[block_offset + 11] << 8)
-                
-                r0, g0, b0 = self._decode_rgb565(c0)
-                r1, g1, b1 = self._decode_rgb565(c1)
-                
-                colors = [
-                    r0, g0, b0,
-                    r1, g1, b1,
-                    (2 * r0 + r1) // 3, (2 * g0 + g1) // 3, (2 * b0 + b1) // 3,
-                    (r0 + 2 * r1) // 3, (g0 + 2 * g1) // 3, (b0 + 2 * b1) // 3
-                ]
-                
-                indices = (compressed[block_offset + 12] |
-                          (compressed[block_offset + 13] << 8) |
-                          (compressed[block_offset + 14] << 16) |
-                          (compressed[block_offset + 15] << 24))
-                
-                for py in range(4):
-                    for px in range(4):
-                        x = bx * 4 + px
-                        y = by * 4 + py
-                        if x >= width or y >= height:
-                            continue
-                        
-                        color_index = (indices >> ((py * 4 + px) * 2)) & 0x3
-                        alpha_index = py * 4 + px
-                        alpha = ((alphas >> (alpha_index * 4)) & 0xF) * 17
-                        
-                        out_offset = (y * width + x) * 4
-                        output[out_offset + 0] = colors[color_index * 3 + 0]
-                        output[out_offset + 1] = colors[color_index * 3 + 1]
-                        output[out_offset + 2] = colors[color_index * 3 + 2]
-                        output[out_offset + 3] = alpha
-                
-                block_index += 1
+        blocks = _dxt_blocks(compressed, width, height, 16)
+        if blocks is None:
+            return
+        
+        texels = _dxt_color_texels(blocks[:, 8:], four_color_only=True)
+        
+        # Explicit 4-bit alpha, low nibble first, expanded to 8 bits
+        alpha_bytes = blocks[:, :8]
+        alpha = np.empty((len(blocks), 8, 2), dtype=np.uint8)
+        alpha[:, :, 0] = alpha_bytes & 0xF
+        alpha[:, :, 1] = alpha_bytes >> 4
+        texels[:, :, 3] = alpha.reshape(-1, 16) * 17
+        
+        _store_dxt_blocks(output, texels, width, height)
     
     def _decompress_dxt5(self, compressed: bytes, output: bytearray, width: int, height: int):
         """Decompress DXT5 block-compressed data"""
+        if _decompress_dxt_native('dxt5_decode', compressed, output, width, height):
+            return
+        
+        if NUMBA_AVAILABLE:
+            _dxt5_numba(np.frombuffer(compressed, dtype=np.uint8),
+                        np.frombuffer(output, dtype=np.uint8), width, height)
+            return
+        
+        blocks = _dxt_blocks(compressed, width, height, 16)
+        if blocks is None:
+            return
+        
+        texels = _dxt_color_texels(blocks[:, 8:], four_color_only=True)
+        
+        # Alpha palette: 8 interpolated values if a0 > a1, else 6 plus 0 and 255
+        a0 = blocks[:, 0].astype(np.int32)[:, None]
+        a1 = blocks[:, 1].astype(np.int32)[:, None]
+        steps7 = np.arange(1, 7, dtype=np.int32)
+        steps5 = np.arange(1, 5, dtype=np.int32)
+        alpha_palette = np.empty((len(blocks), 8), dtype=np.int32)
+        alpha_palette[:, 0:1] = a0
+        alpha_palette[:, 1:2] = a1
+        interp7 = ((7 - steps7) * a0 + steps7 * a1) // 7
+        interp5 = np.concatenate((
+            ((5 - steps5) * a0 + steps5 * a1) // 5,
+            np.zeros_like(a0),
+            np.full_like(a0, 255),
+        ), axis=1)
+        alpha_palette[:, 2:] = np.where(a0 > a1, interp7, interp5)
+        
+        # 48 bits of 3-bit alpha indices, zero-padded to a little-endian u8 load
+        alpha_bytes = np.zeros((len(blocks), 8), dtype=np.uint8)
+        alpha_bytes[:, :6] = blocks[:, 2:8]
+        alpha_bits = alpha_bytes.view('<u8').ravel()
+        alpha_index = (alpha_bits[:, None] >> _ALPHA_INDEX_SHIFTS) & np.uint64(7)
+        texels[:, :, 3] = np.take_along_axis(alpha_palette, alpha_index.astype(np.intp), axis=1)
+        
+        _store_dxt_blocks(output, texels, width, height)
+
+
+# Optional compiled decoder (_dxt_decoder.c), loaded on first use
+_DXT_LIBRARY_NAME = '_dxt_decoder' + {'win32': '.dll', 'darwin': '.dylib'}.get(sys.platform, '.so')
+_dxt_library = None
+_dxt_library_checked = False
+
+
+def _load_dxt_library():
+    """Load the compiled DXT decoder next to this module, or return None if it isn't built"""
+    global _dxt_library, _dxt_library_checked
+    if _dxt_library_checked:
+        return _dxt_library
+    _dxt_library_checked = True
+    
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), _DXT_LIBRARY_NAME)
+    if not os.path.exists(path):
+        return None
+    
+    try:
+        library = ctypes.CDLL(path)
+        for name in ('dxt1_decode', 'dxt3_decode', 'dxt5_decode'):
+            decode = getattr(library, name)
+            decode.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_int, ctypes.c_int)
+            decode.restype = None
+    except (OSError, AttributeError) as e:
+        print(f"[VTF] Failed to load {path}, using the Python decoder: {e}")
+        return None
+    
+    _dxt_library = library
+    return _dxt_library
+
+
+def _decompress_dxt_native(name: str, compressed, output: bytearray, width: int, height: int) -> bool:
+    """Decode with the compiled decoder straight into output. Returns False if it isn't available."""
+    library = _load_dxt_library()
+    if library is None:
+        return False
+    
+    src = np.frombuffer(compressed, dtype=np.uint8)
+    dst = np.frombuffer(output, dtype=np.uint8)
+    getattr(library, name)(src.ctypes.data, src.nbytes, dst.ctypes.data, width, height)
+    return True
+
+
+# RGB565 -> 8-bit component lookup tables, indexed by the full 16-bit color
+_RGB565 = np.arange(65536, dtype=np.int32)
+_R5 = (((_RGB565 >> 11) & 0x1F) * 255 // 31).astype(np.uint8)
+_G6 = (((_RGB565 >> 5) & 0x3F) * 255 // 63).astype(np.uint8)
+_B5 = ((_RGB565 & 0x1F) * 255 // 31).astype(np.uint8)
+del _RGB565
+
+# Bit offsets of the 16 texel indices in a DXT block (2-bit color, 3-bit DXT5 alpha)
+_COLOR_INDEX_SHIFTS = np.arange(16, dtype=np.uint32) * 2
+_ALPHA_INDEX_SHIFTS = np.arange(16, dtype=np.uint64) * 3
+
+
+def _dxt_blocks(compressed, width: int, height: int, block_bytes: int):
+    """View the complete blocks of a DXT mip as an (N, block_bytes) uint8 array, or None if empty"""
+    block_count = min(((width + 3) // 4) * ((height + 3) // 4), len(compressed) // block_bytes)
+    if block_count == 0:
+        return None
+    return np.frombuffer(compressed, dtype=np.uint8, count=block_count * block_bytes).reshape(-1, block_bytes)
+
+
+def _decode_rgb565_array(color):
+    """Decode an array of RGB565 colors to an (..., 3) int32 array of 8-bit components"""
+    rgb = np.empty(color.shape + (3,), dtype=np.int32)
+    rgb[..., 0] = _R5[color]
+    rgb[..., 1] = _G6[color]
+    rgb[..., 2] = _B5[color]
+    return rgb
+
+
+def _dxt_color_texels(color_blocks, four_color_only: bool):
+    """Decode the 8-byte color part of DXT blocks to (N, 16, 4) uint8 RGBA texels"""
+    # Two little-endian u2 endpoints followed by a u4 of 2-bit indices
+    endpoints = np.ascontiguousarray(color_blocks[:, :4]).view('<u2')
+    c0 = endpoints[:, 0]
+    c1 = endpoints[:, 1]
+    rgb0 = _decode_rgb565_array(c0)
+    rgb1 = _decode_rgb565_array(c1)
+    
+    palette = np.empty((len(color_blocks), 4, 4), dtype=np.int32)
+    palette[:, 0, :3] = rgb0
+    palette[:, 1, :3] = rgb1
+    palette[:, 2, :3] = (2 * rgb0 + rgb1) // 3
+    palette[:, 3, :3] = (rgb0 + 2 * rgb1) // 3
+    palette[:, :, 3] = 255
+    if not four_color_only:
+        three_color = c0 <= c1
+        palette[three_color, 2, :3] = (rgb0[three_color] + rgb1[three_color]) // 2
+        palette[three_color, 3] = 0
+    
+    indices = np.ascontiguousarray(color_blocks[:, 4:8]).view('<u4').ravel()
+    color_index = ((indices[:, None] >> _COLOR_INDEX_SHIFTS) & 3).astype(np.intp)
+    
+    texels = np.take_along_axis(palette, color_index[:, :, None], axis=1)
+    return texels.astype(np.uint8)
+
+
+@lru_cache(maxsize=16)
+def _dxt_pixel_offsets(width: int, height: int):
+    """Destination pixel index of every texel, as a (blocks, 16) array in block order,
+    and the mask of texels that fall inside the image"""
+    block_width = (width + 3) // 4
+    blocks = np.arange(block_width * ((height + 3) // 4))
+    texels = np.arange(16)
+    y = (blocks // block_width * 4)[:, None] + texels // 4
+    x = (blocks % block_width * 4)[:, None] + texels % 4
+    offsets = y * width + x
+    inside = (y < height) & (x < width)
+    offsets.setflags(write=False)
+    inside.setflags(write=False)
+    return offsets, inside
+
+
+def _store_dxt_blocks(output: bytearray, texels, width: int, height: int):
+    """Write (N, 16, 4) block texels into the RGBA output, clipping blocks at the image edge.
+    Blocks missing from truncated data stay zero."""
+    block_width = (width + 3) // 4
+    block_height = (height + 3) // 4
+    
+    if width % 4 == 0 and height % 4 == 0 and len(texels) == block_width * block_height:
+        # Every block is present and whole: one strided copy
+        # (block row, block col, texel row, texel col) -> (pixel row, pixel col)
+        out = np.frombuffer(output, dtype=np.uint8).reshape(block_height, 4, block_width, 4, 4)
+        out[:] = texels.reshape(block_height, block_width, 4, 4, 4).transpose(0, 2, 1, 3, 4)
+        return
+    
+    # Scatter whole RGBA pixels through the precomputed offset table
+    offsets, inside = _dxt_pixel_offsets(width, height)
+    offsets = offsets[:len(texels)]
+    inside = inside[:len(texels)]
+    pixels = np.ascontiguousarray(texels).view(np.uint32).reshape(-1, 16)
+    out = np.frombuffer(output, dtype=np.uint32)
+    out[offsets[inside]] = pixels[inside]
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, boundscheck=False)
+    def _dxt5_numba(compressed, output, width, height):
+        """Decompress DXT5 blocks from a uint8 array into a flat RGBA uint8 array.
+        Blocks missing from truncated data are left untouched."""
         block_width = (width + 3) // 4
-        block_height = (height + 3) // 4
-        block_index = 0
+        block_count = min(block_width * ((height + 3) // 4), compressed.shape[0] // 16)
+        colors = np.empty((4, 3), dtype=np.int32)
+        alphas = np.empty(8, dtype=np.int32)
         
-        for by in range(block_height):
-            for bx in range(block_width):
-                block_offset = block_index * 16
-                if block_offset + 16 > len(compressed):
+        for block in range(block_count):
+            offset = block * 16
+            
+            # Alpha palette
+            a0 = np.int32(compressed[offset])
+            a1 = np.int32(compressed[offset + 1])
+            alphas[0] = a0
+            alphas[1] = a1
+            if a0 > a1:
+                for i in range(1, 7):
+                    alphas[i + 1] = ((7 - i) * a0 + i * a1) // 7
+            else:
+                for i in range(1, 5):
+                    alphas[i + 1] = ((5 - i) * a0 + i * a1) // 5
+                alphas[6] = 0
+                alphas[7] = 255
+            
+            alpha_indices = np.int64(0)
+            for i in range(6):
+                alpha_indices |= np.int64(compressed[offset + 2 + i]) << (8 * i)
+            
+            # Color palette (always 4-color mode)
+            c0 = np.int32(compressed[offset + 8]) | (np.int32(compressed[offset + 9]) << 8)
+            c1 = np.int32(compressed[offset + 10]) | (np.int32(compressed[offset + 11]) << 8)
+            colors[0, 0] = _R5[c0]
+            colors[0, 1] = _G6[c0]
+            colors[0, 2] = _B5[c0]
+            colors[1, 0] = _R5[c1]
+            colors[1, 1] = _G6[c1]
+            colors[1, 2] = _B5[c1]
+            for ch in range(3):
+                colors[2, ch] = (2 * colors[0, ch] + colors[1, ch]) // 3
+                colors[3, ch] = (colors[0, ch] + 2 * colors[1, ch]) // 3
+            
+            indices = np.int64(0)
+            for i in range(4):
+                indices |= np.int64(compressed[offset + 12 + i]) << (8 * i)
+            
+            block_x = (block % block_width) * 4
+            block_y = (block // block_width) * 4
+            for py in range(4):
+                y = block_y + py
+                if y >= height:
                     break
-                
-                # Read alpha endpoints
-                a0 = compressed[block_offset]
-                a1 = compressed[block_offset + 1]
-                
-                # Read alpha indices (48 bits = 6 bytes)
-                alpha_indices = 0
-                for i in range(6):
-                    alpha_indices |= compressed[block_offset + 2 + i] << (i * 8)
-                
-                # Calculate alpha palette
-                alpha_palette = [0] * 8
-                alpha_palette[0] = a0
-                alpha_palette[1] = a1
-                if a0 > a1:
-                    alpha_palette[2] = (6 * a0 + 1 * a1) // 7
-                    alpha_palette[3] = (5 * a0 + 2 * a1) // 7
-                    alpha_palette[4] = (4 * a0 + 3 * a1) // 7
-                    alpha_palette[5] = (3 * a0 + 4 * a1) // 7
-                    alpha_palette[6] = (2 * a0 + 5 * a1) // 7
-                    alpha_palette[7] = (1 * a0 + 6 * a1) // 7
-                else:
-                    alpha_palette[2] = (4 * a0 + 1 * a1) // 5
-                    alpha_palette[3] = (3 * a0 + 2 * a1) // 5
-                    alpha_palette[4] = (2 * a0 + 3 * a1) // 5
-                    alpha_palette[5] = (1 * a0 + 4 * a1) // 5
-                    alpha_palette[6] = 0
-                    alpha_palette[7] = 255
-                
-                # Read color data
-                c0 = compressed[block_offset + 8] | (compressed[block_offset + 9] << 8)
-                c1 = compressed[block_offset + 10] | (compressed[block_offset + 11] << 8)
-                
-                r0, g0, b0 = self._decode_rgb565(c0)
-                r1, g1, b1 = self._decode_rgb565(c1)
-                
-                colors = [
-                    r0, g0, b0,
-                    r1, g1, b1,
-                    (2 * r0 + r1) // 3, (2 * g0 + g1) // 3, (2 * b0 + b1) // 3,
-                    (r0 + 2 * r1) // 3, (g0 + 2 * g1) // 3, (b0 + 2 * b1) // 3
-                ]
-                
-                indices = (compressed[block_offset + 12] |
-                          (compressed[block_offset + 13] << 8) |
-                          (compressed[block_offset + 14] << 16) |
-                          (compressed[block_offset + 15] << 24))
-                
-                for py in range(4):
-                    for px in range(4):
-                        x = bx * 4 + px
-                        y = by * 4 + py
-                        if x >= width or y >= height:
-                            continue
-                        
-                        color_index = (indices >> ((py * 4 + px) * 2)) & 0x3
-                        alpha_idx = (alpha_indices >> ((py * 4 + px) * 3)) & 0x7
-                        
-                        out_offset = (y * width + x) * 4
-                        output[out_offset + 0] = colors[color_index * 3 + 0]
-                        output[out_offset + 1] = colors[color_index * 3 + 1]
-                        output[out_offset + 2] = colors[color_index * 3 + 2]
-                        output[out_offset + 3] = alpha_palette[alpha_idx]
-                
-                block_index += 1
+                for px in range(4):
+                    x = block_x + px
+                    if x >= width:
+                        break
+                    texel = py * 4 + px
+                    color_index = (indices >> (2 * texel)) & 3
+                    alpha_index = (alpha_indices >> (3 * texel)) & 7
+                    pixel = (y * width + x) * 4
+                    output[pixel] = colors[color_index, 0]
+                    output[pixel + 1] = colors[color_index, 1]
+                    output[pixel + 2] = colors[color_index, 2]
+                    output[pixel + 3] = alphas[alpha_index]
+
+# PIL 'bcn' decoder variant for each block-compressed format
+_PIL_BCN = {
+    VtfImageFormat.DXT1: 1,
+    VtfImageFormat.DXT1_ONEBITALPHA: 1,
+    VtfImageFormat.DXT3: 2,
+    VtfImageFormat.DXT5: 3,
+}
 
 
 def convert_vtf_to_png(vtf_path: str, output_path: str = None) -> Optional[str]:
@@ -518,24 +693,41 @@ def convert_vtf_to_png(vtf_path: str, output_path: str = None) -> Optional[str]:
         if vtf is None:
             return None
         
-        rgba_data = vtf.convert_to_rgba()
-        if rgba_data is None:
-            print(f"[VTF] Failed to convert {vtf_path} to RGBA")
-            return None
-        
-        if output_path is None:
-            output_path = os.path.splitext(vtf_path)[0] + '.png'
-        
-        if has_pil:
-            # Use PIL for proper PNG saving
-            img = Image.frombytes('RGBA', (vtf.width, vtf.height), rgba_data)
-            # VTF images are often stored flipped
-            img = img.transpose(Image.FLIP_TOP_BOTTOM)
-            img.save(output_path, 'PNG')
-        else:
-            # Fallback: save as raw TGA (simpler format)
-            output_path = os.path.splitext(output_path)[0] + '.tga'
-            save_tga(output_path, vtf.width, vtf.height, rgba_data)
+        with vtf:
+            # Let PIL's C decoder handle block-compressed mips directly
+            img = None
+            bcn = _PIL_BCN.get(vtf.high_res_format) if has_pil else None
+            compressed = vtf.get_largest_mip_data() if bcn is not None else None
+            if compressed is not None:
+                try:
+                    img = Image.frombytes('RGBA', (vtf.width, vtf.height), compressed, 'bcn', (bcn,))
+                except ValueError:
+                    # Truncated data: fall back to our decoder, which zero-fills missing blocks
+                    img = None
+            
+            if img is None:
+                rgba_data = vtf.convert_to_rgba()
+                if rgba_data is None:
+                    print(f"[VTF] Failed to convert {vtf_path} to RGBA")
+                    return None
+            
+            if output_path is None:
+                output_path = os.path.splitext(vtf_path)[0] + '.png'
+            
+            if has_pil:
+                # Use PIL for proper PNG saving
+                if img is None:
+                    img = Image.frombytes('RGBA', (vtf.width, vtf.height), rgba_data)
+                # VTF images are often stored flipped
+                img = img.transpose(Image.FLIP_TOP_BOTTOM)
+                img.save(output_path, 'PNG')
+            else:
+                # Fallback: save as raw TGA (simpler format)
+                output_path = os.path.splitext(output_path)[0] + '.tga'
+                save_tga(output_path, vtf.width, vtf.height, rgba_data)
+            
+            # Drop the views into the file so the mapping can be closed right away
+            compressed = rgba_data = None
         
         print(f"[VTF] Converted: {vtf_path} -> {output_path}")
         return output_path
@@ -561,14 +753,10 @@ def save_tga(filepath: str, width: int, height: int, rgba_data: bytes):
         header[17] = 0x28  # Image descriptor (top-left origin + 8 alpha bits)
         f.write(header)
         
-        # Convert RGBA to BGRA (TGA format)
-        bgra = bytearray(len(rgba_data))
-        for i in range(0, len(rgba_data), 4):
-            bgra[i + 0] = rgba_data[i + 2]  # B
-            bgra[i + 1] = rgba_data[i + 1]  # G
-            bgra[i + 2] = rgba_data[i + 0]  # R
-            bgra[i + 3] = rgba_data[i + 3]  # A
-        
+        # Convert RGBA to BGRA (TGA format) by swapping the R and B channels
+        # with extended slice assignment
+        bgra = bytearray(rgba_data)
+        bgra[0::4], bgra[2::4] = bytes(rgba_data[2::4]), bytes(rgba_data[0::4])
         f.write(bgra)
 
 
@@ -584,46 +772,77 @@ def load_vtf_as_blender_image(vtf_path: str, image_name: str = None):
         Blender image object, or None on failure
     """
     try:
-        import bpy
-        
         vtf = VtfFile.load(vtf_path)
         if vtf is None:
             return None
         
-        rgba_data = vtf.convert_to_rgba()
-        if rgba_data is None:
-            return None
-        
         if image_name is None:
             image_name = os.path.basename(vtf_path)
         
-        # Create Blender image
-        img = bpy.data.images.new(image_name, vtf.width, vtf.height, alpha=True)
+        # The pixels are copied into the Blender image, so the file can be closed after
+        with vtf:
+            return _create_blender_image(vtf, image_name)
         
-        # Convert bytes to float pixels (Blender uses 0-1 range)
-        pixels = []
-        for i in range(0, len(rgba_data), 4):
-            pixels.extend([
-                rgba_data[i + 0] / 255.0,  # R
-                rgba_data[i + 1] / 255.0,  # G
-                rgba_data[i + 2] / 255.0,  # B
-                rgba_data[i + 3] / 255.0   # A
-            ])
-        
-        # VTF images are stored bottom-to-top, need to flip
-        flipped_pixels = []
-        for y in range(vtf.height - 1, -1, -1):
-            row_start = y * vtf.width * 4
-            flipped_pixels.extend(pixels[row_start:row_start + vtf.width * 4])
+    except Exception as e:
+        print(f"[VTF] Error loading {vtf_path} into Blender: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+
+def load_vtf_to_blender(data, image_name: str):
+    """
+    Load VTF data already in memory into Blender as an image.
+    
+    Args:
+        data: bytes or any buffer object (memoryview, mmap, ...), or a file-like
+              object such as BytesIO. Buffers are parsed in place without a copy.
+        image_name: Name for the Blender image
+    
+    Returns:
+        Blender image object, or None on failure
+    """
+    try:
+        if hasattr(data, 'getbuffer'):
+            data = data.getbuffer()
+        elif hasattr(data, 'read'):
+            data = data.read()
         
-        img.pixels = flipped_pixels
-        img.pack()
+        vtf = VtfFile.parse(data)
+        if vtf is None:
+            return None
         
-        print(f"[VTF] Loaded into Blender: {image_name} ({vtf.width}x{vtf.height})")
-        return img
+        # Release the views into data once the pixels are copied into the Blender image
+        with vtf:
+            return _create_blender_image(vtf, image_name)
         
     except Exception as e:
-        print(f"[VTF] Error loading {vtf_path} into Blender: {e}")
+        print(f"[VTF] Error loading {image_name} into Blender: {e}")
         import traceback
         traceback.print_exc()
         return None
+
+
+def _create_blender_image(vtf: VtfFile, image_name: str):
+    """Create a packed Blender image from a parsed VTF, or return None if it can't be decoded"""
+    import bpy
+    
+    rgba_data = vtf.convert_to_rgba()
+    if rgba_data is None:
+        return None
+    
+    # Create Blender image
+    img = bpy.data.images.new(image_name, vtf.width, vtf.height, alpha=True)
+    
+    # VTF images are stored bottom-to-top, need to flip.
+    # The flip is a strided view, so the float conversion is the only copy;
+    # scale it in place to Blender's 0-1 range
+    rgba = np.frombuffer(rgba_data, dtype=np.uint8).reshape(vtf.height, vtf.width, 4)
+    flipped_pixels = rgba[::-1].astype(np.float32)
+    flipped_pixels *= np.float32(1.0 / 255.0)
+    
+    img.pixels.foreach_set(flipped_pixels.ravel())
+    img.pack()
+    
+    print(f"[VTF] Loaded into Blender: {image_name} ({vtf.width}x{vtf.height})")
+    return img